@@ -0,0 +1,225 @@
+"""
+@Date: 10/18/2026
+@Description: Raw CAN frame decoding shared by the parser and the live console: loading the DBC files, the dispatch table
+              and per-frame decoding. Only needs the standard library until the DBC is loaded, cantools comes in with
+              the database (see dbc_cache), so the console can start without pulling in pandas/numpy/scipy.
+
+get_dbc_files --> list_dbc_files
+              --> dbc_cache.load_database --> merge_dbc_files
+build_dispatch_table --> make_dispatch_table
+                     --> custom_decoders.frame_registry
+decode_frame (numbers) --> parse_message / parse_message_better (text) --> format_value
+parse_time --> timestamps.format_time_ms
+"""
+
+# Imports
+import os
+import sys
+from collections import namedtuple
+from dbc_cache import load_database, dbc_table
+from timestamps import format_time_ms
+
+def list_dbc_files():
+    '''
+    @brief: Finds every DBC file in the DBC_Files folder.
+    @input: N/A
+    @return: A list of DBC file paths
+    '''
+    try:
+        path_name = 'DBC_Files'
+        file_path = []
+        for root, dirs, files in os.walk(path_name, topdown=False):
+            for name in files:
+                if ".dbc" in name or ".DBC" in name:
+                    fp = os.path.join(root, name)
+                    file_path.append(fp)
+    except:
+        print('FATAL ERROR: Process failed at step 1.')
+        sys.exit(0)
+    return file_path
+
+def merge_dbc_files(file_path):
+    '''
+    @brief: Parses the DBC files and adds them together.
+    @input: The DBC file paths
+    @return: The merged cantools database
+    '''
+    import cantools
+    mega_dbc=cantools.database.Database()
+    for filename in file_path:
+        with open (filename, 'r') as newdbc:
+            mega_dbc.add_dbc(newdbc)
+    return mega_dbc
+
+def get_dbc_files(verbose=True):
+    # Get all the DBC files for parsing and add them together.
+    # The merged database comes from dbc_cache.pickle unless a DBC file changed since it was written.
+    file_path = list_dbc_files()
+    file_count = len(file_path)
+    mega_dbc = load_database(file_path, merge_dbc_files)
+
+    if verbose: print('Step 1: found ' + str(file_count) + ' files in the DBC files folder')
+    return mega_dbc
+
+def list_decoder_files():
+    '''
+    @brief: Finds every file that decides how frames are decoded: the DBC files, the custom decoder frame ID file, and
+            the custom decoder table and scales (custom_decoders.py, multipliers.py), so editing a field or a scale
+            parses the logs again.
+    @input: N/A
+    @return: A list of file paths
+    '''
+    import custom_decoders
+    import multipliers
+    file_path = list_dbc_files()
+    if os.path.exists(custom_decoders.FRAME_IDS_FILE):
+        file_path.append(custom_decoders.FRAME_IDS_FILE)
+    file_path += [os.path.relpath(custom_decoders.__file__), os.path.relpath(multipliers.__file__)]
+    return file_path
+
+# Lookup table of an enum signal: decoded value --> name, and the name of values not in the table
+# (None prints the number itself, which is what cantools does for DBC choices)
+Choices = namedtuple("Choices", ["names", "default"])
+
+# Prepared per-message decoder. DBC records are built by make_dispatch_table and kept in the DBC cache.
+# formats holds the text format of each signal: None for the number itself, "hex", or a Choices table.
+# Custom records (custom=True) come from custom_decoders, their decode already gives [message, label[], value[], unit[]].
+DecoderRecord = namedtuple("DecoderRecord", ["name", "signals", "units", "scales", "offsets", "decode", "formats", "custom"], defaults=[None, False])
+
+# One decoded frame. Values are numbers (int or float); enum values are their integer code, named by formats.
+# labels and units are tuples shared by every frame of the same message layout, so they can key per-message caches.
+DecodedFrame = namedtuple("DecodedFrame", ["message", "labels", "values", "units", "formats"])
+
+def build_dispatch_table(db):
+    '''
+    @brief: Gets the decoder registry of a DBC database: the DBC dispatch table (from the DBC cache if it has one, see
+            make_dispatch_table) plus the custom decoders of custom_decoders.frame_registry for frame IDs the DBC does not define.
+    @input: The (merged) DBC database from get_dbc_files
+    @return: A dictionary of integer frame ID --> DecoderRecord
+    '''
+    from custom_decoders import frame_registry
+    dispatch = dbc_table(db, "dispatch", make_dispatch_table)
+    custom = frame_registry()
+    if not custom:
+        return dispatch
+    dispatch = dict(dispatch)
+    for frame_id, decoder in custom.items():
+        if frame_id not in dispatch:
+            dispatch[frame_id] = DecoderRecord(decoder.name, decoder.labels, decoder.units, None, None, decoder.decode,
+                                               decoder.formats, True)
+    return dispatch
+
+def signal_choices(signal):
+    '''
+    @brief: Gets the lookup table of a DBC signal's choices, keyed by the decoded (scaled) value.
+    @input: The cantools signal
+    @return: A Choices table, or None if the signal has no choices
+    '''
+    if not signal.choices:
+        return None
+    if signal.scale == 1 and signal.offset == 0:
+        return Choices({raw: str(name) for raw, name in signal.choices.items()}, None)
+    return Choices({raw * signal.scale + signal.offset: str(name) for raw, name in signal.choices.items()}, None)
+
+def make_dispatch_table(db):
+    '''
+    @brief: Precompiles the DBC into a dispatch table so each frame costs a single dict lookup.
+            Signal order, units, scale/offset and choice tables are resolved here instead of on every frame.
+    @input: The (merged) DBC database from get_dbc_files
+    @return: A dictionary of integer frame ID --> DecoderRecord
+    '''
+    dispatch = {}
+    for message in db.messages:
+        # Later DBC definitions of the same frame ID win, same as db.decode_message
+        actual_message = db.get_message_by_frame_id(message.frame_id)
+        formats = tuple(signal_choices(signal) for signal in actual_message.signals)
+        dispatch[message.frame_id] = DecoderRecord(
+            actual_message.name,
+            tuple(signal.name for signal in actual_message.signals),
+            tuple(str(signal.unit) for signal in actual_message.signals),
+            tuple(signal.scale for signal in actual_message.signals),
+            tuple(signal.offset for signal in actual_message.signals),
+            actual_message.decode,
+            formats if any(formats) else None
+        )
+    return dispatch
+
+def choice_name(value, value_format):
+    '''
+    @brief: Gets the enum name of a decoded value.
+    @input: The value and its format from DecodedFrame.formats
+    @return: The name, or None if the value is not an enum value
+    '''
+    if value_format is None or value_format == "hex":
+        return None
+    return value_format.names.get(value, value_format.default)
+
+def format_value(value, value_format):
+    '''
+    @brief: Formats a decoded value as text, the way it is written to the CSVs.
+    @input: The value and its format from DecodedFrame.formats
+    @return: The value string
+    '''
+    if value_format is None:
+        return str(value)
+    if value_format == "hex":
+        return hex(value)
+    name = value_format.names.get(value, value_format.default)
+    return str(value) if name is None else name
+
+def decode_frame(id, data, dispatch, unknown_ids):
+    '''
+    @brief: Decodes one raw frame through the dispatch table, keeping the values as numbers.
+    @input: The raw hex ID and payload strings, the table from build_dispatch_table and a Counter of unknown IDs
+    @return: A DecodedFrame, "INVALID_ID" if the ID is not in the table, or "UNPARSEABLE" if a custom decoder rejected the frame
+    '''
+    record = dispatch.get(int(id,16))
+    if record is None:
+        unknown_ids[id] += 1
+        return "INVALID_ID"
+    if record.custom:
+        table = record.decode(bytes.fromhex(data))
+        if table == "UNPARSEABLE":
+            return table
+        return DecodedFrame(table[0], table[1], table[2], table[3], record.formats)
+    parsed_message = record.decode(bytearray.fromhex(data), False)
+    values = list(parsed_message.values())
+    if len(values) == len(record.signals):
+        return DecodedFrame(record.name, record.signals, values, record.units, record.formats)
+    # Multiplexed messages only decode the signals their multiplexer selects
+    labels = tuple(parsed_message)
+    indices = [record.signals.index(label) for label in labels]
+    formats = None if record.formats is None else tuple(record.formats[i] for i in indices)
+    return DecodedFrame(record.name, labels, values, tuple(record.units[i] for i in indices), formats)
+
+def parse_message(id, data, dispatch, unknown_ids):
+    '''
+    @brief: Decodes one raw frame through the dispatch table into text (see decode_frame for the numeric version).
+    @input: The raw hex ID and payload strings, the table from build_dispatch_table and a Counter of unknown IDs
+    @return: A four-element list [message, label[], value[], unit[]] with the values as strings, "INVALID_ID" if the ID is
+             not in the table, or "UNPARSEABLE" if a custom decoder rejected the frame
+    '''
+    frame = decode_frame(id, data, dispatch, unknown_ids)
+    if type(frame) is str:
+        return frame
+    if frame.formats is None:
+        values = [str(value) for value in frame.values]
+    else:
+        values = [format_value(value, value_format) for value, value_format in zip(frame.values, frame.formats)]
+    return [frame.message, frame.labels, values, frame.units]
+
+def parse_message_better(id, data, dispatch, unknown_ids):
+    frame = decode_frame(id, data, dispatch, unknown_ids)
+    if type(frame) is str:
+        return frame
+    if frame.formats is None:
+        return dict(zip(frame.labels, frame.values))
+    return {label: format_value(value, value_format) for label, value, value_format in zip(frame.labels, frame.values, frame.formats)}
+
+def parse_time(raw_time):
+    '''
+    @brief: Converts raw time into human-readable time (see timestamps.format_time_ms).
+    @input: The raw time given by the raw data CSV.
+    @return: A string representing the human-readable time.
+    '''
+    return format_time_ms(int(raw_time))
@@ -0,0 +1,265 @@
+"""
+@Date: 10/18/2026
+@Description: Columnar (Parquet) output for parsed signal samples, written alongside the Parsed_Data CSVs.
+              Times are stored as integer epoch milliseconds and values as float64 (enum signals as their integer code),
+              with the names of enum choices in a separate column. Message, label, unit and choice columns are
+              dictionary-encoded, so each distinct string is stored once per row group instead of once per sample.
+              Samples are buffered in a samples.SampleBuffer until a row group is written.
+
+              Two layouts:
+                  session: one Columnar_Data/<session>.parquet file holding every sample (time_ms, message, label,
+                           value, choice, unit), grouped by signal within each row group
+                  signal:  one Columnar_Data/<session>/<label>.parquet file per signal (time_ms, value, choice), with the
+                           message and unit in the file metadata, so loading one channel only reads that channel's bytes
+
+ColumnarSink --> add_frame / add_samples (samples.SampleBuffer) --> flush --> signal_table --> close
+concat_parts (parallel parsing) --> read_signal
+"""
+
+# Imports
+import os
+import sys
+import shutil
+import numpy as np
+from samples import SampleBuffer
+from can_decode import choice_name
+
+LAYOUTS = ["session", "signal"]
+FLUSH_ROWS = 262144 # Samples buffered before a row group is written
+
+def require_pyarrow():
+    '''
+    @brief: Imports pyarrow, which is only needed for columnar output.
+    @input: N/A
+    @return: (pyarrow, pyarrow.parquet)
+    '''
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        print("FATAL ERROR: Columnar output needs pyarrow. Install it with: pip install pyarrow")
+        sys.exit(0)
+    return pyarrow, pyarrow.parquet
+
+def columnar_path(filename):
+    '''
+    @brief: Gets the output path of a raw CSV's columnar data, without the .parquet extension.
+    @input: The filename of the raw CSV
+    @return: The path under Columnar_Data
+    '''
+    return os.path.join("Columnar_Data", os.path.splitext(filename)[0])
+
+class ColumnarSink:
+    '''
+    @brief: Buffers decoded samples and writes them out as Parquet row groups, grouped by signal.
+    @input: The output path from columnar_path and the layout ("session" or "signal")
+    '''
+    def __init__(self, path, layout):
+        if layout not in LAYOUTS:
+            print("FATAL ERROR: Unknown columnar layout: " + str(layout))
+            sys.exit(0)
+        self.pa, self.pq = require_pyarrow()
+        self.path = path
+        self.layout = layout
+        self.samples = SampleBuffer()
+        self.index = self.samples.index
+        self.groups = {} # (message, label) or label --> group number
+        self.group_names = [] # group number --> (message, label, unit) of its first signal
+        self.signal_groups = [] # signal ID --> group number
+        self.writers = {}
+
+        parent = os.path.dirname(path)
+        if parent and not os.path.exists(parent):
+            os.makedirs(parent)
+        # Clear the output of the previous run
+        if layout == "signal":
+            shutil.rmtree(path, ignore_errors=True)
+            os.makedirs(path)
+        elif os.path.exists(path + ".parquet"):
+            os.remove(path + ".parquet")
+
+    def add_frame(self, time_ms, frame):
+        '''
+        @brief: Adds every value of a decoded frame.
+        @input: Epoch ms time and a can_decode.DecodedFrame
+        @return: N/A
+        '''
+        self.samples.add_frame(time_ms, frame)
+        if len(self.samples) >= FLUSH_ROWS:
+            self.flush()
+
+    def add_samples(self, times_ms, signal_ids, values):
+        '''
+        @brief: Adds a run of samples, e.g. a decoded chunk of the NumPy engine.
+        @input: Arrays of epoch ms times, signal IDs (interned in self.index) and numeric values
+        @return: N/A
+        '''
+        self.samples.add_samples(times_ms, signal_ids, values)
+        if len(self.samples) >= FLUSH_ROWS:
+            self.flush()
+
+    def signal_group(self, signal_id):
+        '''
+        @brief: Gets the output group of a signal. The session layout keeps signals that share a label across messages
+                apart, the signal layout writes them to the same file (its metadata keeps the first message).
+        @input: The signal ID
+        @return: The group number
+        '''
+        signal = self.index.signals[signal_id]
+        key = (signal.message, signal.label) if self.layout == "session" else signal.label
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = len(self.group_names)
+            self.group_names.append((signal.message, signal.label, signal.unit))
+        return group
+
+    def signal_table(self, times, ids, values):
+        '''
+        @brief: Builds the time_ms/value/choice columns of one group of samples.
+        @input: Arrays of epoch ms times, signal IDs and values
+        @return: A dictionary of pyarrow arrays
+        '''
+        pa = self.pa
+        choices = None
+        for signal_id in np.unique(ids).tolist():
+            value_format = self.index.signals[signal_id].format
+            if value_format is None or value_format == "hex":
+                continue
+            if choices is None:
+                choices = np.full(len(values), None, dtype=object)
+            rows = np.flatnonzero(ids == signal_id)
+            # Name each distinct code once
+            codes, inverse = np.unique(values[rows], return_inverse=True)
+            names = np.empty(len(codes), dtype=object)
+            names[:] = [choice_name(code, value_format) for code in codes.tolist()]
+            choices[rows] = names[inverse]
+        if choices is None or not any(choice is not None for choice in choices.tolist()):
+            # Most signals are plain numbers
+            choice_column = pa.nulls(len(values), type=pa.dictionary(pa.int32(), pa.string()))
+        else:
+            choice_column = pa.array(choices, type=pa.string()).dictionary_encode()
+        return {
+            "time_ms": pa.array(times),
+            "value": pa.array(values),
+            "choice": choice_column
+        }
+
+    def flush(self):
+        '''
+        @brief: Writes the buffered samples as one row group (session layout) or one row group per signal (signal layout).
+        @input: N/A
+        @return: N/A
+        '''
+        if len(self.samples) == 0:
+            return
+        pa = self.pa
+        while len(self.signal_groups) < len(self.index):
+            self.signal_groups.append(self.signal_group(len(self.signal_groups)))
+
+        # Sort the samples by group, keeping their order within a group, and list the groups by first appearance
+        times, ids, values = self.samples.columns()
+        groups = np.array(self.signal_groups, dtype=np.int64)[ids]
+        order = np.argsort(groups, kind="stable")
+        bounds = np.flatnonzero(np.diff(groups[order])) + 1
+        runs = sorted(np.split(order, bounds), key=lambda rows: rows[0])
+
+        tables = []
+        for rows in runs:
+            message, label, unit = self.group_names[groups[rows[0]]]
+            columns = self.signal_table(times[rows], ids[rows], values[rows])
+            if self.layout == "session":
+                count = len(rows)
+                tables.append(pa.table({
+                    "time_ms": columns["time_ms"],
+                    "message": pa.DictionaryArray.from_arrays(pa.array(np.zeros(count, dtype=np.int32)), pa.array([message])),
+                    "label": pa.DictionaryArray.from_arrays(pa.array(np.zeros(count, dtype=np.int32)), pa.array([label])),
+                    "value": columns["value"],
+                    "choice": columns["choice"],
+                    "unit": pa.DictionaryArray.from_arrays(pa.array(np.zeros(count, dtype=np.int32)), pa.array([unit]))
+                }))
+            else:
+                table = pa.table(columns)
+                self.write(label, table.replace_schema_metadata({"message": message, "label": label, "unit": unit}))
+        if tables:
+            self.write("", pa.concat_tables(tables).unify_dictionaries().combine_chunks())
+        del times, ids, values
+        self.samples.clear()
+
+    def write(self, label, table):
+        '''
+        @brief: Appends a table to the Parquet file of a label ("" for the session file), opening it on first use.
+        @input: The label and the table
+        @return: N/A
+        '''
+        writer = self.writers.get(label)
+        if writer is None:
+            if label == "":
+                target = self.path + ".parquet"
+            else:
+                target = os.path.join(self.path, label + ".parquet")
+            writer = self.writers[label] = self.pq.ParquetWriter(target, table.schema, compression="zstd")
+        writer.write_table(table.cast(writer.schema))
+
+    def close(self):
+        '''
+        @brief: Writes the remaining samples and closes every file.
+        @input: N/A
+        @return: N/A
+        '''
+        self.flush()
+        for writer in self.writers.values():
+            writer.close()
+        self.writers = {}
+
+def concat_parts(part_paths, path, layout):
+    '''
+    @brief: Joins the columnar outputs of the byte ranges of one raw CSV, in file order, into its final output.
+    @input: The sink paths of the parts (in order), the final sink path and the layout
+    @return: N/A
+    '''
+    pa, pq = require_pyarrow()
+    parent = os.path.dirname(path)
+    if parent and not os.path.exists(parent):
+        os.makedirs(parent)
+    if layout == "session":
+        if os.path.exists(path + ".parquet"):
+            os.remove(path + ".parquet")
+        sources = [[part + ".parquet" for part in part_paths if os.path.exists(part + ".parquet")]]
+        targets = [path + ".parquet"]
+    else:
+        labels = []
+        for part in part_paths:
+            if not os.path.isdir(part):
+                continue
+            for name in sorted(os.listdir(part)):
+                if name not in labels:
+                    labels.append(name)
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+        sources = [[os.path.join(part, name) for part in part_paths if os.path.exists(os.path.join(part, name))] for name in labels]
+        targets = [os.path.join(path, name) for name in labels]
+
+    for files, target in zip(sources, targets):
+        writer = None
+        for file in files:
+            parquet_file = pq.ParquetFile(file)
+            for group in range(parquet_file.num_row_groups):
+                table = parquet_file.read_row_group(group)
+                if writer is None:
+                    writer = pq.ParquetWriter(target, table.schema, compression="zstd")
+                writer.write_table(table.cast(writer.schema))
+        if writer is not None:
+            writer.close()
+
+def read_signal(path, label):
+    '''
+    @brief: Loads one signal from columnar output of either layout.
+    @input: The sink path from columnar_path and the signal label
+    @return: A dataframe with time_ms, value and choice columns
+    '''
+    pa, pq = require_pyarrow()
+    if os.path.isdir(path):
+        table = pq.read_table(os.path.join(path, label + ".parquet"))
+    else:
+        table = pq.read_table(path + ".parquet", columns=["time_ms", "value", "choice"], filters=[("label", "==", label)])
+    return table.to_pandas()
@@ -0,0 +1,189 @@
+"""
+@Date: 10/18/2026
+@Description: The live console's data handling without the GUI. A ConsoleEngine takes raw frames from any source (the
+              Teensy link through serial_ingest, a recorded log through replay), decodes the ones somebody listens to and
+              publishes them on a SignalBus. Subscribers register by signal name, either per value (alarms, logging) or
+              per frame (the window, which formats whole frames through display_index). Frames that carry no subscribed
+              signal are dropped by frame ID before they are decoded. The engine counts frames and times every one, so
+              console_exe --headless can run and benchmark the whole pipeline with no display.
+              Only needs the standard library until the DBC is loaded (see can_decode).
+
+SignalBus --> subscribe (name --> callback(time_ms, name, value)) / subscribe_frames (names --> callback(time_ms, frame))
+          --> frame_ids (which frame IDs to decode) --> publish (routes resolved once per message layout)
+ConsoleEngine --> feed / feed_live (one raw frame) / run (a source of RawLog.frames tuples) --> stats
+"""
+
+# Imports
+import time
+from collections import Counter
+from can_decode import decode_frame
+from serial_ingest import Latency
+
+class SignalBus:
+    '''
+    @brief: In-process publish/subscribe of decoded signals by name.
+    '''
+    def __init__(self):
+        self.value_subscribers = {} # signal name --> callbacks of (time_ms, name, value)
+        self.frame_subscribers = [] # (signal names or None for every frame, callback of (time_ms, frame))
+        self.routes = {} # (message, labels) --> (((value index, name, callbacks), ...), frame callbacks)
+        self.version = 0 # Bumped on every subscription, so the engine knows to recompute its frame ID filter
+        self.published = 0 # Values and frames handed to subscribers
+
+    def subscribe(self, names, callback):
+        '''
+        @brief: Calls back with every value of the given signals.
+        @input: Signal names and a function of (time_ms, name, value); values stay numbers (enums are their integer code)
+        @return: N/A
+        '''
+        for name in names:
+            self.value_subscribers.setdefault(name, []).append(callback)
+        self.routes.clear()
+        self.version += 1
+
+    def subscribe_frames(self, names, callback):
+        '''
+        @brief: Calls back with every decoded frame that carries any of the given signals.
+        @input: Signal names (None for every frame) and a function of (time_ms, can_decode.DecodedFrame)
+        @return: N/A
+        '''
+        self.frame_subscribers.append((None if names is None else frozenset(names), callback))
+        self.routes.clear()
+        self.version += 1
+
+    def wants(self, labels):
+        '''
+        @brief: Checks if anybody subscribed to any of a set of signals.
+        @input: The signal names
+        @return: True if any is subscribed to
+        '''
+        for names, callback in self.frame_subscribers:
+            if names is None or not names.isdisjoint(labels):
+                return True
+        return any(label in self.value_subscribers for label in labels)
+
+    def frame_ids(self, dispatch, registry=None):
+        '''
+        @brief: Gets the frame IDs worth decoding: those whose message can carry a subscribed signal.
+        @input: The dispatch table from can_decode.build_dispatch_table and the custom decoders from
+                custom_decoders.frame_registry (so multiplexed custom messages are kept for every label they can carry)
+        @return: The set of integer frame IDs
+        '''
+        registry = {} if registry is None else registry
+        return {frame_id for frame_id, record in dispatch.items()
+                if self.wants(registry[frame_id].all_labels if record.custom and frame_id in registry else record.signals)}
+
+    def route(self, frame):
+        '''
+        @brief: Gets who receives what of a decoded frame. Frames of one message share their labels tuple, so routes are
+                resolved once per message (or per multiplexer variant).
+        @input: A can_decode.DecodedFrame
+        @return: (((value index, name, callbacks), ...), (frame callbacks, ...))
+        '''
+        key = (frame.message, frame.labels)
+        route = self.routes.get(key)
+        if route is None:
+            values = tuple((i, label, tuple(self.value_subscribers[label]))
+                           for i, label in enumerate(frame.labels) if label in self.value_subscribers)
+            frames = tuple(callback for names, callback in self.frame_subscribers if names is None or not names.isdisjoint(frame.labels))
+            route = self.routes[key] = (values, frames)
+        return route
+
+    def publish(self, time_ms, frame):
+        '''
+        @brief: Hands a decoded frame to its subscribers, frame subscribers first.
+        @input: The frame's epoch ms time and the can_decode.DecodedFrame
+        @return: N/A
+        '''
+        values, frames = self.route(frame)
+        for callback in frames:
+            callback(time_ms, frame)
+        for i, label, callbacks in values:
+            value = frame.values[i]
+            for callback in callbacks:
+                callback(time_ms, label, value)
+        self.published += len(frames) + len(values)
+
+class ConsoleEngine:
+    '''
+    @brief: Decodes raw frames onto a SignalBus. Subscribe before feeding frames; later subscriptions are picked up too.
+    @input: The dispatch table from can_decode.build_dispatch_table, the SignalBus and the custom decoders from
+            custom_decoders.frame_registry
+    '''
+    def __init__(self, dispatch, bus, registry=None):
+        self.dispatch = dispatch
+        self.bus = bus
+        self.registry = registry
+        self.version = None # SignalBus.version the frame ID filter was computed for
+        self.frame_ids = set()
+        self.unknown_ids = Counter()
+        self.frames = 0 # Frames fed
+        self.skipped = 0 # Frames nobody subscribed to (or unknown IDs), not decoded
+        self.decoded = 0 # Frames decoded and published
+        self.unparseable = 0 # Frames a custom decoder rejected
+        self.latency = Latency() # Per published frame: decoding and publishing it
+        self.started = None # perf_counter of the first frame
+        self.last = None # perf_counter of the latest frame
+
+    def feed(self, time_ms, raw_id, raw_message):
+        '''
+        @brief: Decodes one raw frame and publishes it, if anybody listens to it.
+        @input: The frame's epoch ms time, and its raw hex ID and payload strings
+        @return: N/A
+        '''
+        start = time.perf_counter()
+        if self.started is None:
+            self.started = start
+        self.last = start
+        if self.version != self.bus.version:
+            self.frame_ids = self.bus.frame_ids(self.dispatch, self.registry)
+            self.version = self.bus.version
+        self.frames += 1
+        if int(raw_id, 16) not in self.frame_ids:
+            self.skipped += 1
+            return
+        frame = decode_frame(raw_id, raw_message, self.dispatch, self.unknown_ids)
+        if type(frame) is str:
+            self.unparseable += 1
+            return
+        self.bus.publish(time_ms, frame)
+        self.decoded += 1
+        self.latency.add(time.perf_counter() - start)
+
+    def feed_live(self, raw_id, raw_message):
+        '''
+        @brief: Feeds a frame of the live link, which has no timestamp of its own, at the current time.
+                Matches the handle of serial_ingest.SerialIngest.
+        @input: The raw hex ID and payload strings
+        @return: N/A
+        '''
+        self.feed(int(time.time() * 1000), raw_id, raw_message)
+
+    def run(self, frames):
+        '''
+        @brief: Feeds every frame of a source, e.g. replay.Replay.frames or raw_log.RawLog.frames.
+        @input: An iterable of (raw time string, raw ID string, dlc, hex payload string) tuples
+        @return: N/A
+        '''
+        for raw_time, raw_id, length, raw_message in frames:
+            self.feed(int(raw_time), raw_id, raw_message)
+
+    def stats(self):
+        '''
+        @brief: Gets the counters of the engine.
+        @input: N/A
+        @return: A dictionary of the frames fed/skipped/decoded/unparseable, the values and frames published, the
+                 throughput in frames per second from the first frame to the latest, and the mean/max per-frame latency in milliseconds
+        '''
+        seconds = 0.0 if self.started is None else self.last - self.started
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "decoded": self.decoded,
+            "unparseable": self.unparseable,
+            "published": self.bus.published,
+            "seconds": seconds,
+            "frames_per_s": self.frames / seconds if seconds > 0 else 0.0,
+            "latency_ms": self.latency.mean_ms(),
+            "max_latency_ms": 1000.0 * self.latency.max,
+        }
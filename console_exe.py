@@ -5,22 +5,26 @@
 '''
 
 
-import PySimpleGUI as sg, sys
+import sys
 import time
 import threading
 from os import path
 from enum import Enum
 from datetime import datetime
-import paho.mqtt.client as mqtt
 import itertools
 import binascii
 import struct
 import sys
 import argparse
-import serial
 import glob
-from parser_api import *
+from can_decode import get_dbc_files, build_dispatch_table
+from custom_decoders import frame_registry
 from decimal import Decimal
+from replay import Replay, parse_elapsed
+from display_scheduler import DisplayScheduler
+from display_index import DisplayIndex, text
+from serial_ingest import SerialIngest
+from console_engine import SignalBus, ConsoleEngine
 __file__ = sys.path[0]
 
 parser = argparse.ArgumentParser(description="Telemetry console")
@@ -28,31 +32,15 @@ parser.add_argument('--mode', '-m', action='store', default='0', required=False,
 parser.add_argument('--font', '-f', action='store', default='Comic Sans', required=False, help="Font to use")
 parser.add_argument('--title_size', '-ts', action='store', default='14', required=False, help="Title font")
 parser.add_argument('--body_size', '-bs', action='store', default='10', required=False, help='Body font size')
+parser.add_argument('--replay', action='store', default='raw_data.csv', required=False, help="Raw data CSV the TEST_CSV connection replays")
+parser.add_argument('--speed', action='store', default='1', required=False, help="Replay speed as a multiple of real time, or max to replay as fast as possible")
+parser.add_argument('--start', action='store', default='0', required=False, help="Time into the log the replay starts at, in seconds or mm:ss")
+parser.add_argument('--port', action='store', default=None, required=False, help="Teensy serial port for --headless --mode 1 (the GUI asks for it)")
+parser.add_argument('--headless', action='store_true', help="Run the decode/update engine without the GUI and print its throughput and latency (--mode 1 or 2)")
+parser.add_argument('--fps', action='store', default='20', required=False, help="Display updates per second; values that change faster are dropped (the latest one is shown)")
 
 args = parser.parse_args()
 
-class ReadLine:
-    def __init__(self, s):
-        self.buf = bytearray()
-        self.s = s
-
-    def fastreadline(self):
-        i = self.buf.find(b"\n")
-        if i >= 0:
-            r = self.buf[:i+1]
-            self.buf = self.buf[i+1:]
-            return r
-        while True:
-            i = max(1, min(2048, self.s.in_waiting))
-            data = self.s.read(i)
-            i = data.find(b"\n")
-            if i >= 0:
-                r = self.buf + data[:i+1]
-                self.buf[0:] = data[i+1:]
-                return r
-            else:
-                self.buf.extend(data)
-
 # Connection type definitions
 class ConnectionType(Enum):
     SERVER = 0
@@ -191,27 +179,38 @@ inverter_power = 0.0
 ALPHA = 0.95 # for filtering
 
 '''
-@brief: Helper function to search for keys in a nested dictionary
-@reference: https://stackoverflow.com/questions/49662970/how-can-i-search-for-specific-keys-in-this-nested-dictionary-in-python
-@param[in]: k - the key to search
-@param[in]: d - the (nested) dictionary
-@param[out]: true if found, false if not
+@brief: Helper function to build the console engine, with the display (the window) subscribed to the signals in DICT
+        Call once the BMS detailed panels are added to DICT
+@param[in]: display - the DisplayScheduler the GUI draws from
+@param[out]: the ConsoleEngine
 '''
-def recursive_lookup(k, d):
-    if k in d: return d[k]
-    for v in d.values():
-        if isinstance(v, dict):
-            a = recursive_lookup(k, v)
-            if a is not None: return a
-    return None
+def build_engine(display):
+    dispatch = build_dispatch_table(get_dbc_files())
+    bus = SignalBus()
+    index = DisplayIndex(DICT)
+    # Values stay numbers; only the ones shown on the GUI are formatted
+    bus.subscribe_frames(index.labels, lambda time_ms, frame: show_frame(frame, index, display))
+    return ConsoleEngine(dispatch, bus, frame_registry())
+
+'''
+@brief: Helper function to post the displayed values of a decoded frame to the display
+@param[in]: frame - the DecodedFrame
+@param[in]: index - the DisplayIndex
+@param[in]: display - the DisplayScheduler the GUI draws from
+'''
+def show_frame(frame, index, display):
+    for signal in index.signals(frame):
+        data = frame.values[signal.index]
+        display.post(signal.key, text(signal, data))
+        handle_inverter_power(signal.key, data, display)
 
 '''
 @brief: Helper function to calculate inverter power if inverter voltage or current is updated
 @param[in]: name - name of the parsed label
 @param[in]: data - the parsed data; if used, it will be a floating-type value
-@param[in]: window - the PySimpleGUI window object
+@param[in]: display - the DisplayScheduler the GUI draws from
 '''
-def handle_inverter_power(name, data, window):
+def handle_inverter_power(name, data, display):
     # Specially handle Inverter output power since it is not a CAN label and needs calculation
     if name == "Pack_Current" or name == "D1_DC_Bus_Voltage":
         if name == "D1_DC_Bus_Voltage":
@@ -227,7 +226,7 @@ def handle_inverter_power(name, data, window):
         global inverter_power
         inverter_power = round(ALPHA * inverter_power + (1.0 - ALPHA) * inverter_current * inverter_voltage, 2)
 
-        window.write_event_value("-Update Data-", ["OUTPUT_POWER", "OUTPUT POWER: " + str(inverter_power) + " W"])
+        display.post("OUTPUT_POWER", "OUTPUT POWER: " + str(inverter_power) + " W")
 
 def serial_ports():
     """ Lists serial port names
@@ -247,6 +246,7 @@ def serial_ports():
     else:
         raise EnvironmentError('Unsupported platform')
 
+    import serial # Only the live link needs pyserial, --headless replays run without it
     result = []
     for port in ports:
         try:
@@ -258,6 +258,7 @@ def serial_ports():
     return result
 
 def user_prompt(prompt,options):
+    import PySimpleGUI as sg # Only the GUI needs PySimpleGUI, --headless runs without it
     layoutt = [  [sg.Text(prompt)],     # Part 2 - The Layout
             [sg.Text(options)],
             [sg.Input()],
@@ -272,84 +273,103 @@ def user_prompt(prompt,options):
     windoww.close()      
     return values[0]
 
-def read_from_teensy_thread(window, comport):
-    db = get_dbc_files()
-    dbc_ids = print_all_the_shit_in_dbc_file(db)
-    unknown_ids=[]
+'''
+@brief: Helper function to build the link statistics text of the header
+@param[in]: stats - the dictionary from SerialIngest.stats
+@param[in]: capacity - the queue size of the SerialIngest
+@param[out]: the text
+'''
+def link_stats_text(stats, capacity):
+    return ("LINK: " + str(stats["lines"]) + " LINES, QUEUE " + str(stats["depth"]) + "/" + str(capacity) +
+            " (MAX " + str(stats["max_depth"]) + "), DROPPED " + str(stats["dropped"]) + " (" + str(stats["overflows"]) +
+            " OVERFLOWS), WAIT " + format(stats["wait_ms"], ".1f") + "/" + format(stats["max_wait_ms"], ".1f") +
+            " MS, DECODE " + format(1000.0 * stats["decode_ms"], ".0f") + " US")
+
+'''
+@brief: Helper function to open the Teensy serial port
+@param[in]: comport - the serial port of the Teensy
+@param[out]: the open serial.Serial
+'''
+def open_teensy(comport):
+    import serial # Only the live link needs pyserial, --headless replays run without it
     ser = serial.Serial()
     ser.port = comport #Arduino serial port
     ser.baudrate = 256000
     ser.timeout = 10 #specify timeout when using readline()
     ser.open()
-    rl=ReadLine(ser)
     if ser.is_open==True:
         print("\nAll right, serial port now open. Configuration:\n")
         print(ser, "\n") #print serial parameters
     else:
         sys.exit("Opening serial failed")
+    return ser
+
+'''
+@brief: Thread to open the Teensy serial port and run the live ingest: one thread drains the port, another decodes
+        what it read through the console engine, which posts the displayed values (see serial_ingest, console_engine).
+        This thread then keeps the header's link statistics up to date.
+@param[in]: window - the PySimpleGUI window object
+@param[in]: comport - the serial port of the Teensy
+@param[in]: display - the DisplayScheduler the GUI draws from
+'''
+def read_from_teensy_thread(window, comport, display):
+    engine = build_engine(display)
+    ser = open_teensy(comport)
     window.write_event_value("-Connection Success-", "good job!")
+
+    ingest = SerialIngest(ser, engine.feed_live)
+    ingest.start()
     while True:
-        while (ser.in_waiting > 0):
-            # print(ser.in_waiting)
-            line=ser.readline()
-            line=line.replace(b'\r\n',b'')
-            raw_id = (line.split(b',')[0]).decode()
-            raw_message = (line.split(b',')[1]).decode()
-            length = 8
-            # raw_message = raw_message[:(int(length) * 2)] # Strip trailing end of line/file characters that may cause bad parsing
-            # raw_message = raw_message.zfill(16) # Sometimes messages come truncated if 0s on the left. Append 0s so field-width is 16.
-            table = parse_message(raw_id, raw_message,db,dbc_ids,unknown_ids)
-            #print(table)
-            if table != "INVALID_ID" and table != "UNPARSEABLE":
-                for i in range(len(table[1])):
-                    name = table[1][i]
-                    data = table[2][i]
-                    units = table[3][i]
-                    if name == "MCU_STATE":
-                        window.write_event_value("-MCU State Change-", [data.replace("_", " ")])
-                    elif recursive_lookup(name, DICT):
-                        #print("found a thing\n\tname: " + name + "\n\tdata: "+data + "\n\tunits: " + units)
-                        window.write_event_value("-Update Data-", [name, name.replace("_", " ") + ": " + str(data) + " " + units])
-                        handle_inverter_power(name, data, window)
-
-
-'''
-@brief: Thread to read raw CSV line, parse it, and send event to GUI if match 
+        time.sleep(0.5)
+        display.post("-Link Stats Text-", link_stats_text(ingest.stats(), ingest.depth))
+
+
+'''
+@brief: Helper function to build the replay progress text of the header
+@param[in]: stats - the dictionary from Replay.stats
+@param[out]: the text
+'''
+def replay_stats_text(stats):
+    speed = "MAX" if stats["speed"] is None else format(stats["speed"], "g") + "X"
+    return ("REPLAY: " + format_elapsed(stats["elapsed_s"]) + " / " + format_elapsed(stats["length_s"]) + " AT " + speed +
+            ", " + str(stats["played"]) + " FRAMES, LAG " + format(1000.0 * stats["max_lag_s"], ".0f") + " MS")
+
+'''
+@brief: Helper function to format seconds into a log as mm:ss
+@param[in]: seconds - the seconds
+@param[out]: the text
+'''
+def format_elapsed(seconds):
+    minutes, seconds = divmod(int(max(seconds, 0)), 60)
+    return str(minutes) + ":" + str(seconds).zfill(2)
+
+'''
+@brief: Helper function to open the log to replay, from --replay, --speed and --start
+@param[out]: the Replay, positioned at the start time
+'''
+def open_replay():
+    replay = Replay(args.replay, None if args.speed == "max" else float(args.speed))
+    replay.seek_elapsed(parse_elapsed(args.start))
+    return replay
+
+'''
+@brief: Thread to replay a raw CSV at its recorded pace, parse it, and post the value to the display if match (see replay)
         Sends event to close GUI upon CSV read completion
-        Requires a raw data CSV in the current directory with the name raw_data.csv
+        The log, speed and start time come from --replay, --speed and --start
 @param[in]: window - the PySimpleGUI window object
+@param[in]: display - the DisplayScheduler the GUI draws from
 '''
-def read_from_csv_thread(window):
-    db = get_dbc_files()
-    dbc_ids = print_all_the_shit_in_dbc_file(db)
-    unknown_ids=[]
-    infile = open("raw_data.csv", "r")
-    line_count =  1 # bypass first header line
-    raw_data_lines = infile.readlines()
+def read_from_csv_thread(window, display):
+    engine = build_engine(display)
+    replay = open_replay()
     window.write_event_value("-Test Connection Success-", "good job!")
 
-    while line_count < len(raw_data_lines):
-        print("Linecount: "+ str(line_count))
-        raw_id = raw_data_lines[line_count].split(",")[1]
-        length = raw_data_lines[line_count].split(",")[2]
-        raw_message = raw_data_lines[line_count].split(",")[3]
-        raw_message = raw_message[:(int(length) * 2)] # Strip trailing end of line/file characters that may cause bad parsing
-        raw_message = raw_message.zfill(16) # Sometimes messages come truncated if 0s on the left. Append 0s so field-width is 16.
-        table = parse_message(raw_id, raw_message,db,dbc_ids,unknown_ids)
-        #print(table)
-        if table != "INVALID_ID" and table != "UNPARSEABLE":
-            for i in range(len(table[1])):
-                name = table[1][i]
-                data = table[2][i]
-                units = table[3][i]
-                if name == "MCU_STATE":
-                    window.write_event_value("-MCU State Change-", [data.replace("_", " ")])
-                elif recursive_lookup(name, DICT):
-                    #print("found a thing\n\tname: " + name + "\n\tdata: "+data + "\n\tunits: " + units)
-                    window.write_event_value("-Update Data-", [name, name.replace("_", " ") + ": " + str(data) + " " + units])
-                    handle_inverter_power(name, data, window)
-
-        line_count += 1
+    for raw_time, raw_id, length, raw_message in replay.frames():
+        if replay.played % 1024 == 0:
+            display.post("-Link Stats Text-", replay_stats_text(replay.stats()))
+        engine.feed(int(raw_time), raw_id, raw_message)
+    display.post("-Link Stats Text-", replay_stats_text(replay.stats()))
+    replay.close()
 
     window.write_event_value("-Read CSV Done-", "No data for you left")
 
@@ -394,10 +414,42 @@ def get_bms_detailed_messages():
 
 
 
+'''
+@brief: Helper function to pick the color of the vehicle status text
+@param[in]: received_status - the MCU state name, with spaces
+@param[out]: the PySimpleGUI color name
+'''
+def mcu_state_color(received_status):
+    if received_status == "STARTUP": return "cyan"
+    elif received_status == "TRACTIVE SYSTEM NOT ACTIVE": return "light grey"
+    elif received_status == "TRACTIVE SYSTEM ACTIVE": return "orange"
+    elif received_status == "ENABLING INVERTER": return "yellow"
+    elif received_status == "WAITING READY TO DRIVE SOUND": return "green yellow"
+    elif received_status == "READY TO DRIVE": return "green"
+    elif received_status == "UNRECOGNIZED STATE": return "red"
+    else: return "red" # Should not get here since parser will output UNRECOGNIZED STATE if invalid; here just as a failsafe
+
+'''
+@brief: Draws one batch of display updates from the DisplayScheduler with a single refresh
+@param[in]: window - the PySimpleGUI window object
+@param[in]: display - the DisplayScheduler
+@param[in]: batch - dictionary of display key --> latest value
+'''
+def show_updates(window, display, batch):
+    for key, value in batch.items():
+        if key == "-Vehicle Status Text-":
+            window[key].update("VEHICLE STATUS: " + value, text_color=mcu_state_color(value))
+        else:
+            window[key].update(value)
+    stats = display.stats()
+    window["-Last Update Text-"].update("LAST UPDATE: " + datetime.now().strftime('%H:%M:%S.%f')[:-5] + " (" + str(stats["dropped"]) + " dropped)")
+    window.refresh()
+
 '''
 @brief: The main function to spawn the PySimpleGUI and handle events
 '''
 def main():
+    import PySimpleGUI as sg # Only the GUI needs PySimpleGUI, --headless runs without it
     sg.change_look_and_feel("Black")
     title_font = (args.font, int(args.title_size))
     text_font = (args.font, int(args.body_size))
@@ -485,12 +537,16 @@ def main():
     vehicle_status_text = [[sg.Text("VEHICLE STATUS: NOT RECEIVED", justification="left", pad=((0,0),12), font=title_font, key="-Vehicle Status Text-")]]
     divider_text_2 = [[sg.Text(" | ", pad=(5,12), font=title_font)]]
     last_update_text = [[sg.Text("LAST UPDATE: NOT RECEIVED", justification="left", pad=((0,5),12), font=title_font, key="-Last Update Text-")]]
+    divider_text_3 = [[sg.Text(" | ", pad=(5,12), font=title_font)]]
+    link_text = [[sg.Text("LINK: NOT CONNECTED", justification="left", pad=((0,5),12), font=title_font, key="-Link Stats Text-")]]
 
     status_header_column1 = sg.Column(connection_text, pad=(0,0), vertical_alignment='t')
     status_header_column2 = sg.Column(divider_text_1, pad=(0,0), vertical_alignment='t')
     status_header_column3 = sg.Column(vehicle_status_text, pad=(0,0), vertical_alignment='t')
     status_header_column4 = sg.Column(divider_text_2, pad=(0,0), vertical_alignment='t')
     status_header_column5 = sg.Column(last_update_text, pad=(0,0), vertical_alignment='t')
+    status_header_column6 = sg.Column(divider_text_3, pad=(0,0), vertical_alignment='t')
+    status_header_column7 = sg.Column(link_text, pad=(0,0), vertical_alignment='t')
 
     # Data colummns
     column1 = sg.Column(dashboard + [[sg.Text(" ", size=(35,1), pad=(0,0), font=text_font)]] + bms + [[sg.Text(" ", size=(35,1), pad=(0,0), font=text_font)]] + em + [[sg.Text(" ", size=(35,1), pad=(0,0), font=text_font)]] + imu, vertical_alignment='t')
@@ -500,28 +556,37 @@ def main():
     column5 = sg.Column(voltages_second_column + [[sg.Text(" ", size=(35,1), pad=(0,0), font=text_font)]] + bms_detailed_temps + temperatures, vertical_alignment='t')
 
     # Finalize layout
-    layout = [[status_header_column1, status_header_column2, status_header_column3, status_header_column4, status_header_column5], [column1, column2, column3]]
+    layout = [[status_header_column1, status_header_column2, status_header_column3, status_header_column4, status_header_column5,
+               status_header_column6, status_header_column7], [column1, column2, column3]]
 
     window = sg.Window("KSU Motorsports Live Telemetry Console", resizable=True).Layout(layout).Finalize()
     # window.Maximize()
     CONNECTION = int(user_prompt("Enter Connection Type","SERVER=0, TEENSY=1, TEST_CSV=2"))
+    # Values from the reader threads are drawn in batches, at most fps times per second
+    display = DisplayScheduler(float(args.fps))
     # Choose messaging thread based on connection type
     if CONNECTION == ConnectionType.SERVER.value:
         sys.exit("Invalid connection source selection. Terminating script")
     elif CONNECTION == ConnectionType.TEENSY.value:
         comport = user_prompt("Enter Teensy COM port",serial_ports())
-        thread = threading.Thread(target=read_from_teensy_thread, args=[window,comport], daemon=True)
+        thread = threading.Thread(target=read_from_teensy_thread, args=[window,comport,display], daemon=True)
     elif CONNECTION == ConnectionType.TEST_CSV.value:
-        thread = threading.Thread(target=read_from_csv_thread, args=[window], daemon=True)
+        thread = threading.Thread(target=read_from_csv_thread, args=[window,display], daemon=True)
     else:
         sys.exit("Invalid connection source selection. Terminating script")
     #thread = threading.Thread(target=read_from_csv_thread, args=[window], daemon=True)
 
     thread.start()
 
-    # Event Loop
+    # Event Loop. Wakes up at least once per frame to draw the values the reader threads posted since the last one.
+    frame_ms = max(1, int(display.period * 1000))
     while True:
-        event, values = window.read()
+        event, values = window.read(timeout=frame_ms)
+
+        if display.due():
+            batch = display.take()
+            if batch:
+                show_updates(window, display, batch)
 
         if event in (sg.WIN_CLOSED, "Quit"):
             break
@@ -532,29 +597,77 @@ def main():
             window["-Connection Text-"].update("CONSOLE STATUS: TESTING", text_color="yellow")
         elif event == "-Connection Success-":
             window["-Connection Text-"].update("CONSOLE STATUS: CONNECTED", text_color="green")
-        elif event == "-MCU State Change-":
-            received_status = values["-MCU State Change-"][0]
-            status_color = ""
-
-            if received_status == "STARTUP": status_color = "cyan"
-            elif received_status == "TRACTIVE SYSTEM NOT ACTIVE": status_color = "light grey"
-            elif received_status == "TRACTIVE SYSTEM ACTIVE": status_color = "orange"
-            elif received_status == "ENABLING INVERTER": status_color = "yellow"
-            elif received_status == "WAITING READY TO DRIVE SOUND": status_color = "green yellow"
-            elif received_status == "READY TO DRIVE": status_color = "green"
-            elif received_status == "UNRECOGNIZED STATE": status_color = "red"
-            else: status_color = "red" # Should not get here since parser will output UNRECOGNIZED STATE if invalid; here just as a failsafe
-
-            window["-Vehicle Status Text-"].update("VEHICLE STATUS: " + received_status, text_color=status_color)
-            window.refresh()
-        elif event == "-Update Data-":
-            window[values["-Update Data-"][0]].update(values["-Update Data-"][1])
-            window["-Last Update Text-"].update("LAST UPDATE: " + datetime.now().strftime('%H:%M:%S.%f')[:-5])
-            window.refresh()
 
     window.close()
+    print("Display: " + display_stats_text(display.stats()))
+
+'''
+@brief: Helper function to build the display statistics text
+@param[in]: stats - the dictionary from DisplayScheduler.stats
+@param[out]: the text
+'''
+def display_stats_text(stats):
+    return (str(stats["posted"]) + " values posted, " + str(stats["shown"]) + " drawn in " + str(stats["frames"]) +
+            " frames, " + str(stats["dropped"]) + " dropped (most dropped: " + str(stats["most_dropped"]) + ")")
+
+'''
+@brief: Helper function to build the engine statistics text
+@param[in]: stats - the dictionary from ConsoleEngine.stats
+@param[out]: the text
+'''
+def engine_stats_text(stats):
+    return (str(stats["frames"]) + " frames in " + format(stats["seconds"], ".1f") + " s (" + format(stats["frames_per_s"], ".0f") +
+            " frames/s), " + str(stats["decoded"]) + " decoded, " + str(stats["skipped"]) + " skipped, " +
+            str(stats["unparseable"]) + " unparseable, " + str(stats["published"]) + " published, latency " +
+            format(1000.0 * stats["latency_ms"], ".1f") + " us mean / " + format(1000.0 * stats["max_latency_ms"], ".1f") + " us max")
+
+'''
+@brief: Runs the console without the GUI (--headless): the same source, decoding and display updates as the window, with
+        the display batches taken at --fps but not drawn. Prints the engine's throughput and latency every second and
+        a summary at the end (or on Ctrl+C)
+'''
+def run_headless():
+    DICT1, DICT2 = get_bms_detailed_messages()
+    DICT.update(DICT1)
+    DICT.update(DICT2)
+    display = DisplayScheduler(float(args.fps))
+    engine = build_engine(display)
+    thread = None
+    if CONNECTION == ConnectionType.TEENSY.value:
+        if args.port is None:
+            sys.exit("--headless --mode 1 needs the Teensy serial port (--port). Terminating script")
+        source = SerialIngest(open_teensy(args.port), engine.feed_live)
+        source.start()
+    elif CONNECTION == ConnectionType.TEST_CSV.value:
+        source = open_replay()
+        thread = threading.Thread(target=engine.run, args=[source.frames()], daemon=True)
+        thread.start()
+    else:
+        sys.exit("Invalid connection source selection. Terminating script")
+
+    last_print = time.monotonic()
+    try:
+        while thread is None or thread.is_alive():
+            time.sleep(display.period)
+            display.take()
+            if time.monotonic() - last_print >= 1.0:
+                last_print = time.monotonic()
+                print(engine_stats_text(engine.stats()))
+    except KeyboardInterrupt:
+        pass
+
+    print("Engine: " + engine_stats_text(engine.stats()))
+    print("Display: " + display_stats_text(display.stats()))
+    if thread is None:
+        print(link_stats_text(source.stats(), source.depth))
+    else:
+        print(replay_stats_text(source.stats()))
+        source.close()
 
 ############################
 # Entry point to application
 ############################
-main()
\ No newline at end of file
+if args.headless:
+    run_headless()
+else:
+    main()
\ No newline at end of file
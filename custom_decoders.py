@@ -0,0 +1,520 @@
+"""
+@Date: 10/18/2026
+@Description: Table-driven decoders for the custom CAN messages the DBC files do not cover (the parse_ID_* messages of
+              parser_api). Every message is declared once in SPECS as a list of fields: byte offset, struct format,
+              scale, unit and an optional bitfield or enum conversion. CustomDecoder compiles a spec into one
+              precompiled struct.Struct that unpacks every field of the payload in a single call, and generates one
+              decode function doing the shifts, masks and scaling inline, so frames are decoded straight from their
+              bytes instead of through hex strings.
+              Multipliers stay the single source of the scales, they are resolved once when the table is built.
+
+              The frame IDs are not part of the specs: DBC_Files/custom_frame_ids.csv (and register()) say which
+              decoder handles which frame ID, and can_decode merges them into the DBC dispatch table.
+
+SPECS --> get_decoder --> CustomDecoder --> decode
+frame_registry --> read_frame_ids (FRAME_IDS_FILE) + register
+legacy_parser (parse_ID_* compatibility)
+"""
+
+# Imports
+import os
+import sys
+import struct
+from collections import namedtuple
+from multipliers import Multipliers as M
+from can_decode import Choices, format_value
+
+# Which custom decoder handles which frame ID. Lives with the DBC files, since it changes whenever the CAN layout does.
+FRAME_IDS_FILE = os.path.join("DBC_Files", "custom_frame_ids.csv")
+
+# One decoded value. fmt is a struct format (little-endian unless the message says otherwise) starting at byte offset.
+# The raw integer is combined by weights (multi-item formats), shifted right by shift and cut to bits bits
+# (two's complement if signed), then divided by scale and rounded to digits. Fields with convert ("hex", "str" or a Choices
+# table) keep the integer; convert only says how it is written out.
+Field = namedtuple("Field", ["label", "offset", "fmt", "unit", "scale", "digits", "shift", "bits", "signed", "convert", "weights"],
+                   defaults=["", None, None, 0, None, False, None, None])
+# Picks the labels and units of a message from a selector byte (e.g. the board ID of the ACU cell voltages).
+# variants maps the raw selector to (labels, units); selectors not in it are unparseable unless default is given.
+Mux = namedtuple("Mux", ["offset", "fmt", "variants", "default"], defaults=[None])
+# A custom message. guard is an (offset, fmt) pair that must be nonzero for the frame to be decoded.
+Message = namedtuple("Message", ["name", "fields", "order", "mux", "guard"], defaults=["<", None, None])
+
+BOOL = Choices({0: "false", 1: "true"}, "UNRECOGNIZED_BIN")
+MCU_STATES = Choices({0: "STARTUP", 1: "TRACTIVE_SYSTEM_NOT_ACTIVE", 2: "TRACTIVE_SYSTEM_ACTIVE", 3: "ENABLING_INVERTER",
+                      4: "WAITING_READY_TO_DRIVE_SOUND", 5: "READY_TO_DRIVE"}, "UNRECOGNIZED_STATE")
+BLINK_MODES = Choices({0: "off", 1: "on", 2: "fast", 3: "slow"}, "UNRECOGNIZED_BLINK")
+EM_GAINS = Choices({0: "x1", 1: "x2", 2: "x4", 3: "x8", 4: "x16", 5: "x32"}, "N/A")
+
+def flag(label, offset, bit, fmt="B"):
+    '''
+    @brief: Shorthand for a single-bit "true"/"false" field.
+    @input: The label, byte offset, bit number and the struct format the bit is read from
+    @return: The Field
+    '''
+    return Field(label, offset, fmt, shift=bit, bits=1, convert=BOOL)
+
+def bms_detailed_voltage_variants():
+    '''
+    @brief: Labels of BMS_detailed_voltages by their selector byte (group ID in the high nibble, IC ID in the low nibble).
+            Group 3 only exists on even ICs.
+    @input: N/A
+    @return: The Mux variants
+    '''
+    variants = {}
+    for selector in range(256):
+        group_id, ic_id = selector >> 4, selector & 0xF
+        if group_id > 3 or (group_id == 3 and ic_id % 2 == 1):
+            continue
+        ic = "IC_%X_CELL_" % ic_id
+        variants[selector] = ([ic + str(group_id * 3 + i) for i in range(3)], ["V", "V", "V"])
+    return variants
+
+def bms_detailed_temperature_variants():
+    '''
+    @brief: Labels of BMS_detailed_temperatures by their selector byte (group ID in the high nibble, IC ID in the low nibble).
+            GPIO 5 is humidity on even ICs and temperature on odd ones.
+    @input: N/A
+    @return: The Mux variants
+    '''
+    variants = {}
+    for ic_id in range(16):
+        ic = "IC_%X_" % ic_id
+        variants[ic_id] = ([ic + "therm_0", ic + "therm_1", ic + "therm_2"], ["C", "C", "C"])
+        if ic_id % 2 == 0:
+            variants[0x10 | ic_id] = ([ic + "therm_3", ic + "humidity", ic + "Vref"], ["C", "%", "V"])
+        else:
+            variants[0x10 | ic_id] = ([ic + "therm_3", ic + "temperature", ic + "Vref"], ["C", "C", "V"])
+    return variants
+
+# Each ACU board reports every 12th cell
+ACU_CELLS = {board_id: (["Cell_" + str(board_id + 12 * i) for i in range(5)], ["V"] * 5) for board_id in range(12)}
+
+# Messages by the name of their old parse_ID_* function
+SPECS = {
+    "FBHNODE1": Message("Fbhnode1", [
+        Field("roll", 0, "i", "deg", 100),
+        Field("heading", 4, "i", "deg", 100)]),
+    "FBHNODE2": Message("Fbhnode2", [
+        Field("pitch", 0, "i", "deg", 100)]),
+    "MC_TEMPERATURES1": Message("MC_temperatures_1", [
+        Field("module_a_temperature", 0, "h", "C", M.MC_TEMPERATURES1_MODULE_A_TEMPERATURE.value),
+        Field("module_b_temperature", 2, "h", "C", M.MC_TEMPERATURES1_MODULE_B_TEMPERATURE.value),
+        Field("module_c_temperature", 4, "h", "C", M.MC_TEMPERATURES1_MODULE_C_TEMPERATURE.value),
+        Field("gate_driver_board_temperature", 6, "h", "C", M.MC_TEMPERATURES1_GATE_DRIVER_BOARD_TEMPERATURE.value)]),
+    "MC_TEMPERATURES2": Message("MC_temperatures_2", [
+        Field("control_board_temperature", 0, "h", "C", M.MC_TEMPERATURES2_CONTROL_BOARD_TEMPERATURES.value),
+        Field("rtd_1_temperature", 2, "h", "C", M.MC_TEMPERATURES2_RTD_1_TEMPERATURES.value),
+        Field("rtd_2_temperature", 4, "h", "C", M.MC_TEMPERATURES2_RTD_2_TEMPERATURES.value),
+        Field("rtd_3_temperature", 6, "h", "C", M.MC_TEMPERATURES2_RTD_3_TEMPERATURES.value)]),
+    "MC_TEMPERATURES3": Message("MC_temperatures_3", [
+        Field("rtd_4_temperatures", 0, "h", "C", M.MC_TEMPERATURES3_RTD_4_TEMPERATURES.value),
+        Field("rtd_5_temperature", 2, "h", "C", M.MC_TEMPERATURES3_RTD_5_TEMPERATURES.value),
+        Field("motor_temperature", 4, "h", "C", M.MC_TEMPERATURES3_MOTOR_TEMPERATURE.value),
+        Field("torque_shudder", 6, "h", "Nm", M.MC_TEMPERATURES3_TORQUE_SHUDDER.value)]),
+    "MC_MOTOR_POSITION_INFORMATION": Message("MC_motor_position_information", [
+        Field("motor_angle", 0, "h", "deg", M.MC_MOTOR_POSITION_INFORMATION_MOTOR_ANGLE.value),
+        Field("motor_speed", 2, "h", "RPM"),
+        Field("elec_output_freq", 4, "H", "Hz", M.MC_MOTOR_POSITION_INFORMATION_ELEC_OUTPUT_FREQ.value),
+        Field("delta_resolver_filtered", 6, "h")]),
+    "MC_CURRENT_INFORMATION": Message("MC_current_information", [
+        Field("phase_a_current", 0, "h", "A", M.MC_CURRENT_INFORMATION_PHASE_A_CURRENT.value),
+        Field("phase_b_current", 2, "h", "A", M.MC_CURRENT_INFORMATION_PHASE_B_CURRENT.value),
+        Field("phase_c_current", 4, "h", "A", M.MC_CURRENT_INFORMATION_PHASE_C_CURRENT.value),
+        Field("dc_bus_current", 6, "h", "A", M.MC_CURRENT_INFORMATION_DC_BUS_CURRENT.value)]),
+    "MC_VOLTAGE_INFORMATION": Message("MC_voltage_information", [
+        Field("dc_bus_voltage", 0, "h", "V", M.MC_VOLTAGE_INFORMATION_DC_BUS_VOLTAGE.value),
+        Field("output_voltage", 2, "h", "V", M.MC_VOLTAGE_INFORMATION_OUTPUT_VOLTAGE.value),
+        Field("Vd_voltage", 4, "h", "V", M.MC_VOLTAGE_INFORMATION_PHASE_AB_VOLTAGE.value),
+        Field("Vq_voltage", 6, "h", "V", M.MC_VOLTAGE_INFORMATION_PHASE_BC_VOLTAGE.value)]),
+    "MC_FLUX_INFORMATION": Message("MC_flux_information", [
+        Field("Flux_Command", 0, "h", "W", 10),
+        Field("Flux_Feedback", 2, "h", "W", 10),
+        Field("Id_Feedback", 4, "h", "A", 10),
+        Field("Iq_Feedback", 6, "h", "A", 10)]),
+    "MC_INTERNAL_VOLTAGES": Message("MC_INTERNAL_VOLTAGES", [
+        Field("12V_Voltage", 6, "h", "V", 100)]),
+    "MC_INTERNAL_STATES": Message("MC_internal_states", [
+        Field("vsm_state", 0, "H", convert="hex"),
+        Field("inverter_state", 2, "B", convert="hex"),
+        flag("inverter_run_mode", 4, 0),
+        Field("inverter_active_discharge_state", 4, "B", shift=5, convert=BOOL),
+        Field("inverter_command_mode", 5, "B", convert="hex"),
+        flag("inverter_enable_state", 6, 0),
+        flag("inverter_enable_lockout", 6, 7),
+        Field("direction_command", 7, "B", convert="hex")]),
+    "MC_FAULT_CODES": Message("MC_fault_codes", [
+        Field("run_fault_lo", 4, "H", convert="hex"),
+        Field("run_lo_motor_overspeed_fault", 4, "H", bits=1, convert="str"),
+        flag("run_lo_overcurrent_fault", 4, 1, "H"),
+        flag("run_lo_overvoltage_fault", 4, 2, "H"),
+        flag("run_lo_inverter_overtemperature_fault", 4, 3, "H"),
+        flag("run_lo_direction_command_fault", 4, 6, "H"),
+        flag("run_lo_inverter_response_timeout_fault", 4, 7, "H"),
+        flag("run_lo_hardware_gate_desaturation_fault", 4, 8, "H"),
+        flag("run_lo_hardware_overcurrent_fault", 4, 9, "H"),
+        flag("run_lo_undervoltage_fault", 4, 10, "H"),
+        flag("run_lo_can_command_message_lost_fault", 4, 11, "H"),
+        flag("run_lo_motor_overtemperature_fault", 4, 12, "H"),
+        flag("run_lo_reserved1", 4, 13, "H"),
+        flag("run_lo_reserved2", 4, 14, "H"),
+        flag("run_lo_reserved3", 4, 15, "H"),
+        Field("run_fault_hi", 6, "H", convert="hex"),
+        flag("run_hi_module_a_overtemperature_fault", 6, 2, "H"),
+        flag("run_hi_module_b_overtemperature_fault", 6, 3, "H"),
+        flag("run_hi_module_c_overtemperature_fault", 6, 4, "H"),
+        flag("run_hi_pcb_overtemperature_fault", 6, 5, "H"),
+        flag("run_hi_gate_drive_board_1_overtemperature_fault", 6, 6, "H"),
+        flag("run_hi_gate_drive_board_2_overtemperature_fault", 6, 7, "H"),
+        flag("run_hi_gate_drive_board_3_overtemperature_fault", 6, 8, "H"),
+        flag("run_hi_current_sensor_fault", 6, 9, "H"),
+        flag("run_hi_resolver_not_connected", 6, 14, "H"),
+        flag("run_hi_inverter_discharge_active", 6, 15, "H")],
+        guard=(4, "I")), # Only logged while a run fault is set
+    "MC_TORQUE_TIMER_INFORMATION": Message("MC_torque_timer_information", [
+        Field("commanded_torque", 0, "h", "Nm", M.MC_TORQUE_TIMER_INFORMATION_COMMANDED_TORQUE.value),
+        Field("torque_feedback", 2, "h", "Nm", M.MC_TORQUE_TIMER_INFORMATION_TORQUE_FEEDBACK.value),
+        Field("rms_uptime", 4, "I", "s", M.MC_TORQUE_TIMER_INFORMATION_RMS_UPTIME.value)]),
+    "MC_FLUX_WEAKENING_OUTPUT": Message("MC_flux_weakening_output", [
+        Field("modulation_index", 0, "H", convert="hex"),
+        Field("flux_weakening_output", 2, "H", convert="hex"),
+        Field("id_command", 4, "h", "", M.MC_FLUX_WEAKENING_OUTPUT_ID_COMMAND.value),
+        Field("iq_command", 6, "h", "", M.MC_FLUX_WEAKENING_OUTPUT_IQ_COMMAND.value)]),
+    "MC_COMMAND_MESSAGE": Message("MC_command_message", [
+        Field("requested_torque", 0, "h", "Nm", M.MC_COMMAND_MESSAGE_REQUESTED_TORQUE.value),
+        Field("inverter_enable", 5, "B", shift=4)]),
+    "MC_READ_WRITE_PARAMETER_COMMAND": Message("MC_read_write_parameter_command", [
+        Field("parameter_address", 0, "H", convert="hex"),
+        Field("rw_command", 2, "B", bits=4, convert="hex"),
+        Field("reserved1", 3, "B"),
+        Field("data", 4, "I", convert="hex")]),
+    "MC_READ_WRITE_PARAMETER_RESPONSE": Message("MC_read_write_parameter_response", [
+        Field("parameter_address", 0, "H", convert="hex"),
+        Field("write_success", 2, "B", bits=4, convert="hex"),
+        Field("reserved1", 3, "B"),
+        Field("data", 4, "I", convert="hex")]),
+    "MCU_STATUS": Message("MCU_status", [
+        flag("imd_ok_high", 1, 0),
+        flag("shutdown_b_above_threshold", 1, 1),
+        flag("bms_ok_high", 1, 2),
+        flag("shutdown_c_above_threshold", 1, 3),
+        flag("bspd_ok_high", 1, 4),
+        flag("shutdown_d_above_threshold", 1, 5),
+        flag("software_ok_high", 1, 6),
+        flag("shutdown_e_above_threshold", 1, 7),
+        flag("no_accel_implausibility", 2, 2),
+        flag("no_brake_implausibility", 2, 3),
+        flag("brake_pedal_active", 2, 4),
+        flag("bspd_current_high", 2, 5),
+        flag("bspd_brake_high", 2, 6),
+        flag("no_accel_brake_implausibility", 2, 7),
+        Field("mcu_state", 3, "B", bits=3, convert=MCU_STATES),
+        flag("inverter_powered", 3, 3),
+        flag("energy_meter_present", 3, 4),
+        flag("activate_buzzer", 3, 5),
+        flag("software_is_ok", 3, 6),
+        flag("launch_ctrl_active", 3, 7),
+        Field("max_torque", 4, "B", "Nm"),
+        Field("torque_mode", 5, "B"),
+        Field("distance_travelled", 6, "H", "m", M.MCU_STATUS_DISTANCE_TRAVELLED.value)]),
+    "MCU_PEDAL_READINGS": Message("MCU_pedal_readings", [
+        Field("accelerator_pedal_1", 0, "H", "%"),
+        Field("accelerator_pedal_2", 2, "H", "%"),
+        Field("brake_transducer_1", 4, "H", "%"),
+        Field("steering_sensor", 6, "H", "%")]),
+    "MCU_ANALOG_READINGS": Message("MCU_analog_readings", [
+        Field("ecu_current", 0, "H", "A", M.MCU_ANALOG_READINGS_ECU_CURRENT.value),
+        Field("cooling_current", 2, "H", "A", M.MCU_ANALOG_READINGS_COOLING_CURRENT.value),
+        Field("temperature", 4, "h", "C", M.MCU_ANALOG_READINGS_TEMPERATURE.value),
+        Field("glv_battery_voltage", 6, "H", "V", M.MCU_ANALOG_READINGS_GLV_BATTERY_VOLTAGE.value)]),
+    "BMS_ONBOARD_TEMPERATURES": Message("BMS_onboard_temperatures", [
+        Field("average_temperature", 2, "h", "C", M.BMS_ONBOARD_TEMPERATURES_AVERAGE_TEMPERATURE.value),
+        Field("low_temperature", 4, "h", "C", M.BMS_ONBOARD_TEMPERATURES_LOW_TEMPERATURE.value),
+        Field("high_temperature", 6, "h", "C", M.BMS_ONBOARD_TEMPERATURES_HIGH_TEMPERATURE.value)]),
+    "BMS_ONBOARD_DETAILED_TEMPERATURES": Message("BMS_onboard_detailed_temperatures", [
+        Field("temperature_0", 1, "h", "C", M.BMS_ONBOARD_DETAILED_TEMPERATURES_TEMPERATURE_0.value),
+        Field("temperature_1", 3, "h", "C", M.BMS_ONBOARD_DETAILED_TEMPERATURES_TEMPERATURE_1.value)],
+        mux=Mux(0, "B", {ic_id: (["IC_" + str(ic_id) + "_temperature_0", "IC_" + str(ic_id) + "_temperature_1"], ["C", "C"])
+                         for ic_id in range(256)})),
+    "BMS_VOLTAGES": Message("BMS_voltages", [
+        Field("BMS_voltage_average", 0, "H", "V", M.BMS_VOLTAGES_BMS_VOLTAGE_AVERAGE.value),
+        Field("BMS_voltage_low", 2, "H", "V", M.BMS_VOLTAGES_BMS_VOLTAGE_LOW.value),
+        Field("BMS_voltage_high", 4, "H", "V", M.BMS_VOLTAGES_BMS_VOLTAGE_HIGH.value),
+        Field("BMS_voltage_total", 6, "H", "V", M.BMS_VOLTAGES_BMS_VOLTAGE_TOTAL.value)]),
+    "BMS_DETAILED_VOLTAGES": Message("BMS_detailed_voltages", [
+        Field("voltage_0", 2, "H", "V", M.BMS_DETAILED_VOLTAGES_VOLTAGE_0.value),
+        Field("voltage_1", 4, "H", "V", M.BMS_DETAILED_VOLTAGES_VOLTAGE_1.value),
+        Field("voltage_2", 6, "H", "V", M.BMS_DETAILED_VOLTAGES_VOLTAGE_2.value)],
+        mux=Mux(1, "B", bms_detailed_voltage_variants())),
+    "BMS_TEMPERATURES": Message("BMS_temperatures", [
+        Field("BMS_average_temperature", 2, "h", "C", M.BMS_TEMPERATURES_BMS_AVERAGE_TEMPERATURE.value),
+        Field("BMS_low_temperature", 4, "h", "C", M.BMS_TEMPERATURES_BMS_LOW_TEMPERATURE.value),
+        Field("BMS_high_temperature", 6, "h", "C", M.BMS_TEMPERATURES_BMS_HIGH_TEMPERATURE.value)]),
+    "BMS_DETAILED_TEMPERATURES": Message("BMS_detailed_temperatures", [
+        Field("therm_0", 2, "h", "C", M.BMS_DETAILED_TEMPERATURES_THERM_0.value),
+        Field("therm_1", 4, "h", "C", M.BMS_DETAILED_TEMPERATURES_THERM_1.value),
+        Field("therm_2", 6, "h", "C", M.BMS_DETAILED_TEMPERATURES_THERM_2.value)],
+        mux=Mux(1, "B", bms_detailed_temperature_variants())),
+    "BMS_STATUS": Message("BMS_status", [
+        Field("BMS_state", 2, "B", convert="hex"),
+        Field("BMS_error_flags", 3, "H", convert="hex"),
+        flag("BMS_overvoltage", 3, 0, "H"),
+        flag("BMS_undervoltage", 3, 1, "H"),
+        flag("BMS_total_voltage_high", 3, 2, "H"),
+        flag("BMS_discharge_overcurrent", 3, 3, "H"),
+        flag("BMS_charge_overcurrent", 3, 4, "H"),
+        flag("BMS_discharge_overtemp", 3, 5, "H"),
+        flag("BMS_charge_overtemp", 3, 6, "H"),
+        flag("BMS_undertemp", 3, 7, "H"),
+        flag("BMS_onboard_overtemp", 3, 8, "H"),
+        Field("BMS_current", 5, "h", "A", M.BMS_STATUS_BMS_CURRENT.value),
+        Field("BMS_flags", 7, "B", convert="hex"),
+        flag("BMS_shutdown_g_above_threshold", 7, 0),
+        flag("BMS_shutdown_h_above_threshold", 7, 1)]),
+    "CCU_STATUS": Message("CCU_status", [
+        Field("charger_enabled", 7, "B")]),
+    "BMS_COULOMB_COUNTS": Message("BMS_coulomb_counts", [
+        Field("BMS_total_charge", 0, "I", "Ah", M.BMS_COULOMB_COUNTS_BMS_TOTAL_CHARGE.value),
+        Field("BMS_total_discharge", 4, "I", "Ah", M.BMS_COULOMB_COUNTS_BMS_TOTAL_DISCHARGE.value)]),
+    "MCU_GPS_READINGS": Message("MCU_GPS_readings", [
+        Field("latitude", 0, "i", "deg", M.MCU_GPS_READINGS_LATITUDE.value),
+        Field("longitude", 4, "i", "deg", M.MCU_GPS_READINGS_LONGITUDE.value)]),
+    "MCU_WHEEL_SPEED": Message("MCU_wheel_speed", [
+        Field("rpm_front_left", 0, "I", "rpm", 100),
+        Field("rpm_front_right", 4, "I", "rpm", 100)]),
+    # @TODO: FIX THIS with more data
+    "DASHBOARD_STATUS": Message("Dashboard_status", [
+        flag("start_btn", 4, 0),
+        flag("buzzer_active", 4, 1),
+        flag("ssok_above_threshold", 4, 2),
+        flag("shutdown_h_above_threshold", 4, 3),
+        flag("mark_btn", 5, 0),
+        flag("mode_btn", 5, 1),
+        flag("mc_cycle_btn", 5, 2),
+        flag("launch_ctrl_btn", 5, 3),
+        Field("ams_led", 6, "B", shift=0, bits=2, convert=BLINK_MODES),
+        Field("imd_led", 6, "B", shift=2, bits=2, convert=BLINK_MODES),
+        Field("mode_led", 6, "B", shift=4, bits=2, convert=BLINK_MODES),
+        Field("mc_error_led", 6, "B", shift=6, bits=2, convert=BLINK_MODES),
+        Field("start_led", 7, "B", shift=0, bits=2, convert=BLINK_MODES),
+        Field("launch_control_led", 7, "B", shift=2, bits=2, convert=BLINK_MODES)]),
+    "SAB_READINGS_FRONT": Message("SAB_readings_front", [
+        Field("fl_susp_lin_pot", 4, "H", "mm", M.SAB_READINGS_NON_GPS.value),
+        Field("fr_susp_lin_pot", 6, "H", "mm", M.SAB_READINGS_NON_GPS.value)]),
+    "SAB_READINGS_REAR": Message("SAB_readings_rear", [
+        Field("cooling_loop_fluid_temp", 0, "H", "C", M.SAB_READINGS_NON_GPS.value),
+        Field("amb_air_temp", 2, "H", "C", M.SAB_READINGS_NON_GPS.value),
+        Field("bl_susp_lin_pot", 4, "H", "mm", M.SAB_READINGS_NON_GPS.value),
+        Field("br_susp_lin_pot", 6, "H", "mm", M.SAB_READINGS_NON_GPS.value)]),
+    "SAB_READINGS_GPS": Message("SAB_readings_gps", [
+        Field("gps_latitude", 0, "i", "deg", M.SAB_READINGS_GPS.value),
+        Field("gps_longitude", 4, "i", "deg", M.SAB_READINGS_GPS.value)]),
+    "EM_MEASUREMENT": Message("EM_measurement", [
+        Field("current", 0, "Q", "A", M.EM_MEASUREMENTS_CURRENT.value, 2, shift=25, bits=32, signed=True),
+        Field("voltage", 0, "Q", "V", M.EM_MEASUREMENTS_VOLTAGE.value, 2, bits=25)],
+        order=">"),
+    "EM_STATUS": Message("EM_status", [
+        Field("voltage_gain", 4, "B", "gain", shift=4, bits=4, convert=EM_GAINS),
+        Field("current_gain", 4, "B", "gain", bits=4, convert=EM_GAINS),
+        flag("overvoltage", 5, 7),
+        flag("overpower", 5, 6),
+        flag("logging", 5, 5)]),
+    "IMU_ACCELEROMETER": Message("IMU_accelerometer", [
+        Field("lat_accel", 2, "h", "m/s/s", M.IMU_ACCELEROMETER_ALL.value, 4),
+        Field("long_accel", 4, "h", "m/s/s", M.IMU_ACCELEROMETER_ALL.value, 4),
+        Field("vert_accel", 6, "h", "m/s/s", M.IMU_ACCELEROMETER_ALL.value, 4)]),
+    "IMU_GYROSCOPE": Message("IMU_gyroscope", [
+        Field("yaw", 2, "h", "deg/s", M.IMU_GYROSCOPE_ALL.value, 4),
+        Field("pitch", 4, "h", "deg/s", M.IMU_GYROSCOPE_ALL.value, 4),
+        Field("roll", 6, "h", "deg/s", M.IMU_GYROSCOPE_ALL.value, 4)]),
+    "ORIONBMS_MESSAGE1": Message("Orion BMS1", [
+        Field("DCL", 0, "H", "A"),
+        Field("hightemp", 4, "b", "C"),
+        Field("lowtemp", 5, "b", "C")]),
+    "ORIONBMS_MESSAGE2": Message("Orion BMS2", [
+        Field("PackCurrent", 0, "h", "Amps"),
+        Field("PackInstVolt", 2, "h", "Volts", 10),
+        Field("PackOpenVolt", 4, "h", "Volts", 10),
+        Field("PackSummedVolt", 6, "h", "Volts", 100)]),
+    "PRECHARGE": Message("Precharge", [
+        Field("State", 0, "B", "State"),
+        Field("AccVoltage", 1, "2B", "V", weights=(1, 100)),
+        Field("TSVoltage", 3, "2B", "V", weights=(1, 100))]),
+    "SHONK_POTS": Message("Shock_Pots", [
+        Field("Shonk_FL", 0, "H"),
+        Field("Shonk_FR", 2, "H"),
+        Field("Shonk_RL", 4, "H"),
+        Field("Shonk_RR", 6, "H")]),
+    # Every board sends the same frame, the board ID in the first byte says which cells it holds
+    "ACU_TEMP_SENSORS": Message("Energus_Voltages", [
+        Field("cell_0", 1, "B", "V", 100),
+        Field("cell_1", 2, "B", "V", 100),
+        Field("cell_2", 3, "B", "V", 100),
+        Field("cell_3", 4, "B", "V", 100),
+        Field("cell_4", 5, "B", "V", 100)],
+        mux=Mux(0, "B", ACU_CELLS, (["Cell_69", "Cell_23", "Cell_35", "Cell_47", "Cell_59"], ["V"] * 5))),
+}
+
+def field_expression(field, index, namespace):
+    '''
+    @brief: Writes the Python expression that computes the value of one field from the unpacked payload r.
+            Scales are bound in the namespace of the generated function instead of being inlined.
+    @input: The Field, the index of its first item in r and the namespace dictionary to add constants to
+    @return: The expression string
+    '''
+    if field.weights is None:
+        value = "r[" + str(index) + "]"
+    else:
+        value = "(" + " + ".join("r[" + str(index + i) + "] * " + str(weight) for i, weight in enumerate(field.weights)) + ")"
+    if field.shift:
+        value = "(" + value + " >> " + str(field.shift) + ")"
+    if field.bits is not None:
+        value = "(" + value + " & " + hex((1 << field.bits) - 1) + ")"
+        if field.signed:
+            sign_bit = hex(1 << (field.bits - 1))
+            value = "((" + value + " ^ " + sign_bit + ") - " + sign_bit + ")"
+
+    constant = "c" + str(len(namespace))
+    if field.scale is not None:
+        namespace[constant] = field.scale
+        value = value + " / " + constant
+    if field.digits is not None:
+        value = "round(" + value + ", " + str(field.digits) + ")"
+    return value
+
+class CustomDecoder:
+    '''
+    @brief: A custom message compiled for decoding. The distinct (offset, format) slots of its fields are laid out in one
+            struct format with pad bytes between them, so the whole payload is unpacked with a single call, and the
+            field conversions are compiled into one generated decode function, so a frame costs a single Python call.
+            Values stay numbers: enums are their integer code, named through formats (see can_decode.DecodedFrame).
+    @input: The Message spec
+    '''
+    def __init__(self, spec):
+        self.name = spec.name
+        self.labels = tuple(field.label for field in spec.fields)
+        self.units = tuple(field.unit for field in spec.fields)
+        # Every label a frame of this message can carry, whatever its multiplexer selects
+        if spec.mux is None:
+            self.all_labels = frozenset(self.labels)
+        else:
+            variants = list(spec.mux.variants.values()) + ([] if spec.mux.default is None else [spec.mux.default])
+            self.all_labels = frozenset(label for labels, units in variants for label in labels)
+        # Text format of each value for can_decode.format_value; "str" fields print like plain numbers
+        formats = [None if field.convert == "str" else field.convert for field in spec.fields]
+        self.formats = formats if any(formats) else None
+        self.converts = [field.convert for field in spec.fields]
+
+        fmt = spec.order
+        position = 0
+        item = 0
+        slots = {}
+        for offset, code in sorted(set((field.offset, field.fmt) for field in spec.fields)):
+            if offset < position:
+                raise ValueError("Custom message " + spec.name + " has overlapping fields at byte " + str(offset))
+            fmt += str(offset - position) + "x" + code
+            slots[(offset, code)] = item
+            item += len(struct.unpack(spec.order + code, bytes(struct.calcsize(spec.order + code))))
+            position = offset + struct.calcsize(spec.order + code)
+
+        namespace = {"unpack": struct.Struct(fmt).unpack_from, "name": self.name, "labels": self.labels, "units": self.units}
+        values = ", ".join(field_expression(field, slots[(field.offset, field.fmt)], namespace) for field in spec.fields)
+        lines = ["def decode(data):"]
+        if spec.guard is not None:
+            namespace["guard"] = struct.Struct(spec.order + str(spec.guard[0]) + "x" + spec.guard[1]).unpack_from
+            lines.append("    if guard(data)[0] == 0: return 'UNPARSEABLE'")
+        if spec.mux is not None:
+            namespace["select"] = struct.Struct(spec.order + str(spec.mux.offset) + "x" + spec.mux.fmt).unpack_from
+            # Every frame of a variant hands out the same labels/units tuples (see samples.SignalIndex.frame_ids)
+            namespace["variants"] = {selector: (tuple(labels), tuple(units)) for selector, (labels, units) in spec.mux.variants.items()}
+            namespace["default"] = None if spec.mux.default is None else (tuple(spec.mux.default[0]), tuple(spec.mux.default[1]))
+            lines.append("    variant = variants.get(select(data)[0], default)")
+            lines.append("    if variant is None: return 'UNPARSEABLE'")
+            lines.append("    labels, units = variant")
+        lines.append("    r = unpack(data)")
+        lines.append("    return [name, labels, [" + values + "], units]")
+        self.source = "\n".join(lines)
+        exec(self.source, namespace)
+        self.decode = namespace["decode"]
+        self.decode.__doc__ = "Decodes one " + self.name + " payload (bytes) into [message, label[], value[], unit[]], or \"UNPARSEABLE\"."
+
+# Compiled decoders by the name of their old parse_ID_* function, filled in on first use by get_decoder
+DECODERS = {}
+# Decoders registered in code with register(), by frame ID
+registered = {}
+
+def get_decoder(key):
+    '''
+    @brief: Gets the compiled decoder of a message in SPECS, compiling it the first time it is asked for.
+    @input: The name of the parse_ID_* function without the prefix, e.g. "PRECHARGE"
+    @return: The CustomDecoder
+    '''
+    decoder = DECODERS.get(key)
+    if decoder is None:
+        decoder = DECODERS[key] = CustomDecoder(SPECS[key])
+    return decoder
+
+def register(frame_id, spec):
+    '''
+    @brief: Registers a custom decoder for a frame ID, on top of the ones listed in FRAME_IDS_FILE.
+            Registrations only live in the current process; parallel parsing (--jobs) only sees FRAME_IDS_FILE.
+    @input: The integer frame ID and either the key of a message in SPECS or a Message spec
+    @return: N/A
+    '''
+    registered[frame_id] = get_decoder(spec) if isinstance(spec, str) else CustomDecoder(spec)
+
+def read_frame_ids(path=FRAME_IDS_FILE):
+    '''
+    @brief: Reads which custom decoder handles which frame ID. Each line of the file is "frame ID,decoder", with the
+            frame ID in hex and the decoder a key of SPECS. Blank lines, the header and lines starting with # are skipped.
+    @input: The path of the frame ID file
+    @return: A dictionary of integer frame ID --> SPECS key (empty if the file does not exist)
+    '''
+    frame_ids = {}
+    if not os.path.exists(path):
+        return frame_ids
+    with open(path, "r") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if line == "" or line.startswith("#") or line.replace(" ", "") == "frame_id,decoder":
+                continue
+            fields = [field.strip() for field in line.split(",")]
+            try:
+                frame_id = int(fields[0], 16)
+            except ValueError:
+                frame_id = None
+            if len(fields) != 2 or frame_id is None or fields[1] not in SPECS:
+                print("FATAL ERROR: Bad custom decoder on line " + str(line_number) + " of " + path + ": " + line)
+                sys.exit(0)
+            frame_ids[frame_id] = fields[1]
+    return frame_ids
+
+def frame_registry(path=FRAME_IDS_FILE):
+    '''
+    @brief: Gets every custom decoder by the frame ID it handles, from FRAME_IDS_FILE and register().
+    @input: The path of the frame ID file
+    @return: A dictionary of integer frame ID --> CustomDecoder
+    '''
+    decoders = {frame_id: get_decoder(key) for frame_id, key in read_frame_ids(path).items()}
+    decoders.update(registered)
+    return decoders
+
+def legacy_parser(key):
+    '''
+    @brief: Wraps a compiled decoder in the old parse_ID_* calling convention (a 16-digit hex payload string), which
+            gave enum, hex and "str" fields as strings.
+    @input: The name of the parse_ID_* function without the prefix, e.g. "PRECHARGE"
+    @return: The parse function
+    '''
+    decoder = get_decoder(key)
+    decode = decoder.decode
+    converts = [(i, str if convert == "str" else convert) for i, convert in enumerate(decoder.converts) if convert is not None]
+    def parse(raw_message):
+        table = decode(bytes.fromhex(raw_message))
+        if table != "UNPARSEABLE":
+            table[1] = list(table[1])
+            table[3] = list(table[3])
+            for i, convert in converts:
+                table[2][i] = convert(table[2][i]) if convert is str else format_value(table[2][i], convert)
+        return table
+    parse.__name__ = "parse_ID_" + key
+    return parse
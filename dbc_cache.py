@@ -0,0 +1,114 @@
+"""
+@Date: 10/18/2026
+@Description: Binary cache of the merged DBC database. Parsing the DBC text files with cantools on every start is slow,
+              so the merged database is pickled to dbc_cache.pickle together with the tables derived from it
+              (the dispatch table of parser_api, the layouts of vector_parser, ...). The cache is keyed by the hash of
+              the DBC files, the cantools version and CACHE_VERSION, and is rebuilt automatically when any of them change.
+              Each table is pickled on its own and only unpickled when asked for, so loading the cache does not import
+              the modules of tables that are not used.
+
+load_database --> read_cache / write_cache
+dbc_table --> write_cache
+"""
+
+# Imports
+import os
+import pickle
+from parse_manifest import dbc_set_hash
+
+CACHE_FILE = "dbc_cache.pickle"
+CACHE_VERSION = 2 # Bump when the layout of a cached table changes
+
+# Cache entry of every database handed out by load_database, by id of the database object
+loaded = {}
+
+def cache_key(paths):
+    '''
+    @brief: Gets the key a cache must have to be valid for a set of DBC files.
+    @input: The DBC file paths
+    @return: The key string
+    '''
+    import cantools # Needed from here on anyway, unpickling the database imports it
+    return str(CACHE_VERSION) + ":" + cantools.__version__ + ":" + dbc_set_hash(paths)
+
+def read_cache(key):
+    '''
+    @brief: Reads the cache file if it was made for the given key.
+    @input: The cache key
+    @return: The cache entry ({"key", "database", "tables"} with pickled values), or None
+    '''
+    if not os.path.exists(CACHE_FILE):
+        return None
+    try:
+        with open(CACHE_FILE, "rb") as f:
+            entry = pickle.load(f)
+    except Exception:
+        # A stale or corrupt cache is simply rebuilt
+        return None
+    if not isinstance(entry, dict) or entry.get("key") != key:
+        return None
+    return entry
+
+def write_cache(entry):
+    '''
+    @brief: Writes a cache entry, replacing the old file only once the new one is complete.
+            Failing to write the cache (e.g. a read-only folder) is not an error, the next start just parses the DBCs again.
+    @input: The cache entry
+    @return: N/A
+    '''
+    temp_path = CACHE_FILE + "." + str(os.getpid()) + ".tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            pickle.dump({"key": entry["key"], "database": entry["database"], "tables": entry["tables"]}, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, CACHE_FILE)
+    except OSError:
+        pass
+
+def load_database(paths, build):
+    '''
+    @brief: Loads the merged database of a set of DBC files from the cache, or builds and caches it.
+    @input: The DBC file paths and the function that merges them into a cantools database, called as build(paths)
+    @return: The cantools database
+    '''
+    key = cache_key(paths)
+    entry = read_cache(key)
+    database = None
+    if entry is not None:
+        try:
+            database = pickle.loads(entry["database"])
+        except Exception:
+            database = None
+    if database is None:
+        database = build(paths)
+        entry = {"key": key, "database": pickle.dumps(database, pickle.HIGHEST_PROTOCOL), "tables": {}}
+        write_cache(entry)
+    entry["db"] = database
+    entry["unpickled"] = {}
+    loaded[id(database)] = entry
+    return database
+
+def dbc_table(db, name, build):
+    '''
+    @brief: Gets a table derived from a database, from the cache if it has one, else builds it and adds it to the cache.
+    @input: The database from load_database, the name of the table and the function that builds it, called as build(db)
+    @return: The table
+    '''
+    entry = loaded.get(id(db))
+    if entry is None or entry["db"] is not db:
+        # Not a cached database (e.g. built by hand), nothing to reuse
+        return build(db)
+    if name in entry["unpickled"]:
+        return entry["unpickled"][name]
+
+    table = None
+    if name in entry["tables"]:
+        try:
+            table = pickle.loads(entry["tables"][name])
+        except Exception:
+            table = None
+    if table is None:
+        table = build(db)
+        entry["tables"][name] = pickle.dumps(table, pickle.HIGHEST_PROTOCOL)
+        write_cache(entry)
+    entry["unpickled"][name] = table
+    return table
@@ -0,0 +1,87 @@
+"""
+@Date: 10/18/2026
+@Description: Flat index of what the live console displays, compiled once at startup. The console's panels are nested
+              dictionaries of labels (plus ~170 BMS detailed keys), and searching them for every decoded value, then
+              building the label text, was most of the reader thread's work. A DisplayIndex maps each displayed signal
+              straight to its window element key, label prefix, unit and formatter. Its labels are what the window
+              subscribes to on the console_engine.SignalBus, so frames nobody looks at are dropped before they are decoded.
+              Only needs the standard library.
+
+DisplayIndex --> labels (console_engine.SignalBus.subscribe_frames)
+             --> signals (DisplaySignals of a DecodedFrame, resolved once per message layout) --> text
+"""
+
+# Imports
+from collections import namedtuple
+from can_decode import format_value
+
+# One displayed value of a frame: its position in DecodedFrame.values, the window element key, and what goes around it
+DisplaySignal = namedtuple("DisplaySignal", ["index", "key", "prefix", "unit", "formatter"])
+
+# The MCU state is not a panel entry, it is shown (colored) in the header
+STATUS_SIGNAL = "MCU_STATE"
+STATUS_KEY = "-Vehicle Status Text-"
+
+def panel_labels(panels):
+    '''
+    @brief: Flattens the console's (nested) panel dictionaries into their labels.
+    @input: Dictionary of panel name --> dictionary of label --> initial text, nested to any depth
+    @return: The set of labels
+    '''
+    labels = set()
+    for label, value in panels.items():
+        if isinstance(value, dict):
+            labels.update(panel_labels(value))
+        else:
+            labels.add(label)
+    return labels
+
+def value_formatter(value_format, status=False):
+    '''
+    @brief: Gets the function that turns a decoded value into the text shown on the console.
+    @input: The value's format from DecodedFrame.formats, and whether it is the vehicle status
+    @return: A function of the value
+    '''
+    if status:
+        return lambda value: format_value(value, value_format).replace("_", " ")
+    if value_format is None:
+        return str
+    return lambda value: format_value(value, value_format)
+
+class DisplayIndex:
+    '''
+    @brief: Precomputed map of decoded signals to the console elements that show them.
+    @input: The panel dictionaries
+    '''
+    def __init__(self, panels):
+        self.labels = panel_labels(panels)
+        self.labels.add(STATUS_SIGNAL)
+        self.frames = {} # (message, labels) --> tuple of the frame's DisplaySignals
+
+    def signals(self, frame):
+        '''
+        @brief: Gets the displayed values of a decoded frame. Frames of one message share their labels tuple, so they are
+                resolved once per message (or per multiplexer variant) and every later frame costs one dict lookup.
+        @input: A can_decode.DecodedFrame
+        @return: A tuple of DisplaySignals, empty if nothing in the frame is displayed
+        '''
+        key = (frame.message, frame.labels)
+        signals = self.frames.get(key)
+        if signals is None:
+            signals = []
+            for i, (label, unit) in enumerate(zip(frame.labels, frame.units)):
+                value_format = None if frame.formats is None else frame.formats[i]
+                if label == STATUS_SIGNAL:
+                    signals.append(DisplaySignal(i, STATUS_KEY, "", "", value_formatter(value_format, True)))
+                elif label in self.labels:
+                    signals.append(DisplaySignal(i, label, label.replace("_", " ") + ": ", " " + unit, value_formatter(value_format)))
+            signals = self.frames[key] = tuple(signals)
+        return signals
+
+def text(signal, value):
+    '''
+    @brief: Builds the text of a displayed value, e.g. "Pack Current: 12.5 A".
+    @input: The DisplaySignal and the decoded value
+    @return: The text
+    '''
+    return signal.prefix + signal.formatter(value) + signal.unit
@@ -0,0 +1,85 @@
+"""
+@Date: 10/18/2026
+@Description: Rate-limited, coalescing display updates for the live console. The reader threads decode far more values
+              per second than Tk can draw, and one GUI event per value floods the event queue until the display lags
+              seconds behind the car. Instead the readers post each value to a DisplayScheduler, which only keeps the
+              latest value of every display key, and the GUI thread takes the whole batch of changed keys a fixed number
+              of times per second and draws it with a single refresh. Values replaced before they were drawn are
+              dropped and counted, so the display is never more than one frame behind whatever the bus load.
+              Only needs the standard library, the GUI (PySimpleGUI) stays in console_exe.
+
+reader threads --> DisplayScheduler.post (latest value wins)
+GUI loop --> due --> take (one batch per frame) --> stats
+"""
+
+# Imports
+import time
+import threading
+from collections import Counter
+
+class DisplayScheduler:
+    '''
+    @brief: Latest-value-wins buffer of display updates between reader threads and the GUI thread.
+    @input: The number of batches to draw per second
+    '''
+    def __init__(self, rate_hz=20.0):
+        if rate_hz <= 0:
+            raise ValueError("display rate must be positive, got " + str(rate_hz))
+        self.period = 1.0 / rate_hz
+        self.lock = threading.Lock()
+        self.dirty = {} # display key --> latest value not drawn yet
+        self.last_take = 0.0
+        self.posted = 0
+        self.shown = 0
+        self.frames = 0
+        self.dropped = Counter() # display key --> values replaced before they were drawn
+
+    def post(self, key, value):
+        '''
+        @brief: Queues a value for a display key, replacing the value waiting for that key if there is one.
+                Safe to call from any thread.
+        @input: The display key and its new value
+        @return: N/A
+        '''
+        with self.lock:
+            if key in self.dirty:
+                self.dropped[key] += 1
+            self.dirty[key] = value
+            self.posted += 1
+
+    def due(self):
+        '''
+        @brief: Checks if the next batch should be drawn, i.e. a frame period passed since the last one.
+        @input: N/A
+        @return: True if it is time to take a batch
+        '''
+        return time.monotonic() - self.last_take >= self.period
+
+    def take(self):
+        '''
+        @brief: Takes every key that changed since the last batch, with its latest value. Called by the GUI thread.
+        @input: N/A
+        @return: A dictionary of display key --> value, empty if nothing changed
+        '''
+        with self.lock:
+            batch, self.dirty = self.dirty, {}
+        self.last_take = time.monotonic()
+        if batch:
+            self.frames += 1
+            self.shown += len(batch)
+        return batch
+
+    def stats(self):
+        '''
+        @brief: Gets the counters of the scheduler.
+        @input: N/A
+        @return: A dictionary with the values posted, drawn and dropped, the batches drawn, and the most dropped keys
+        '''
+        with self.lock:
+            return {
+                "posted": self.posted,
+                "shown": self.shown,
+                "dropped": sum(self.dropped.values()),
+                "frames": self.frames,
+                "most_dropped": self.dropped.most_common(5)
+            }
@@ -0,0 +1,80 @@
+"""
+@Date: 10/18/2026
+@Description: Measures the cold-start import cost of the parser and console entry points. Every measurement runs in a
+              fresh interpreter, so nothing is already imported, and the median of several runs is reported.
+              The "everything" row imports all the heavy libraries parser_api used to load at the top, which is what
+              parser_exe.py and console_exe.py paid on every start before the module split.
+
+Run from this folder: py -3 import_benchmark.py [--runs N] [--top N]
+"""
+
+# Imports
+import sys
+import argparse
+import statistics
+import subprocess
+
+# (name, statement timed in a fresh interpreter)
+TARGETS = [
+    ("everything (old parser_api import)", "import cantools, pandas, numpy, scipy.io, dateutil.parser"),
+    ("parser_exe.py: CSV to CSV (parser_api)", "import parser_api"),
+    ("parser_exe.py: CSV to MAT (mat_export)", "import mat_export"),
+    ("console_exe.py: decoding (can_decode, raw_log)", "import can_decode, raw_log"),
+    ("console_exe.py: first DBC load (cached)", "import can_decode; can_decode.build_dispatch_table(can_decode.get_dbc_files(False))"),
+]
+
+def time_statement(statement):
+    '''
+    @brief: Times a statement in a fresh Python interpreter.
+    @input: The statement
+    @return: The time in seconds, or None if it failed (e.g. a library is not installed)
+    '''
+    code = "import time\nstart = time.perf_counter()\n" + statement + "\nprint(time.perf_counter() - start)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+def heaviest_imports(statement, top):
+    '''
+    @brief: Lists the libraries a statement imports that take the longest, using python -X importtime.
+            Looks at the modules imported by the statement and by the modules it names, skipping interpreter startup.
+    @input: The statement and how many imports to list
+    @return: A list of (cumulative seconds, module name)
+    '''
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True)
+    own = statement.split(";")[0].replace("import", "").replace(",", " ").split()
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            cumulative = int(fields[1]) / 1e6
+        except ValueError:
+            continue
+        depth = (len(fields[2]) - len(fields[2].lstrip())) // 2
+        name = fields[2].strip()
+        if depth <= 2 and name not in own and name not in ("site", "encodings"):
+            imports.append((cumulative, name))
+    return sorted(imports, reverse=True)[:top]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start import benchmark")
+    parser.add_argument('--runs', '-r', action='store', type=int, default=5, required=False, help="Fresh interpreters per target")
+    parser.add_argument('--top', '-t', action='store', type=int, default=0, required=False, help="Also list the N slowest imports of each target")
+    args = parser.parse_args()
+
+    # Warm up the DBC cache so the cached load is what gets measured
+    time_statement(TARGETS[-1][1])
+
+    width = max(len(name) for name, statement in TARGETS)
+    for name, statement in TARGETS:
+        times = [time_statement(statement) for i in range(args.runs)]
+        if None in times:
+            print(name.ljust(width) + "   failed (library not installed?)")
+            continue
+        print(name.ljust(width) + "   " + str(round(statistics.median(times) * 1000)).rjust(5) + " ms")
+        if args.top > 0:
+            for cumulative, module in heaviest_imports(statement, args.top):
+                print("    " + module.ljust(width - 4) + "   " + str(round(cumulative * 1000)).rjust(5) + " ms")
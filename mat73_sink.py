@@ -0,0 +1,302 @@
+"""
+@Date: 10/18/2026
+@Description: Streaming MATLAB v7.3 (HDF5) export for sessions too long to build output.mat in memory.
+              A v7.3 MAT file is an HDF5 file behind a 512 byte MATLAB header. The struct S is an HDF5 group and every
+              label is a chunked, compressed double dataset in it, so each label's rows are appended while the raw
+              CSVs are still being decoded and only one flush worth of samples (FLUSH_SAMPLES) is ever held in memory.
+              MATLAB stores matrices column-major, so a label's Nx2 [time_elapsed, value] matrix is a 2xN dataset
+              that grows along its second axis. dataPlots.m loads it as S.<label> like the v5 file.
+
+              The rows are the same as mat_export.samples_struct makes: elapsed ms from the start of the first raw CSV
+              with second rollover miscues repaired, and values logged under the same timestamp averaged. Until the
+              first raw CSV is done its start is not known, so times are written from its first sample and shifted
+              once on close if an earlier sample showed up later. The optional decimation pyramid (S10, S100, S1000, see
+              mat_export.decimate) is built on close too, reading each label back in blocks.
+
+parser_api.parse_folder(direct=True, mat_version="7.3") --> Mat73Sink --> begin_file --> add_frame / add_samples / extend
+    --> flush --> mat_export.repair_second_rollover / plottable --> append --> close --> mat_export.decimate --> write_header
+"""
+
+# Imports
+import os
+import sys
+import time
+import numpy as np
+from samples import SampleBuffer
+from mat_export import repair_second_rollover, plottable, report_rollover, decimate, PYRAMID_FACTORS
+
+FLUSH_SAMPLES = 1048576 # Samples buffered before they are written to the datasets
+CHUNK_ROWS = 8192 # Rows per HDF5 chunk of a label's dataset
+BLOCK_ROWS = 64 * PYRAMID_FACTORS[-1] # Rows read back at once on close, whole bins of every pyramid level
+
+def require_h5py():
+    '''
+    @brief: Imports h5py, which is only needed for v7.3 MAT output.
+    @input: N/A
+    @return: The h5py module
+    '''
+    try:
+        import h5py
+    except ImportError:
+        print("FATAL ERROR: MAT v7.3 output needs h5py. Install it with: pip install h5py")
+        sys.exit(0)
+    return h5py
+
+def write_header(path):
+    '''
+    @brief: Writes the MATLAB v7.3 header into the 512 byte user block at the start of an HDF5 file, which is what
+            makes MATLAB's load open it as a MAT file.
+    @input: The path of the closed HDF5 file
+    @return: N/A
+    '''
+    text = "MATLAB 7.3 MAT-file, Platform: " + sys.platform + ", Created on: " + time.strftime("%a %b %d %H:%M:%S %Y") + " HDF5 schema 1.00 ."
+    # 116 bytes of text, 8 bytes of subsystem data offset, then version 0x0200 and the "IM" endian indicator
+    header = text.encode("ascii")[:116].ljust(116, b" ") + bytes(8) + b"\x00\x02IM"
+    with open(path, "r+b") as f:
+        f.write(header)
+
+def create_struct_group(parent, name):
+    '''
+    @brief: Creates an HDF5 group MATLAB loads as a struct.
+    @input: The parent HDF5 group (or file) and the struct's name
+    @return: The group
+    '''
+    group = parent.create_group(name)
+    group.attrs["MATLAB_class"] = np.bytes_("struct")
+    return group
+
+def create_matrix(group, name, columns):
+    '''
+    @brief: Creates an empty, growable double matrix field of a struct group. MATLAB is column-major, so an Nx<columns>
+            matrix is stored as a <columns>xN dataset, chunked and compressed along the rows.
+    @input: The struct group, the field name and the number of columns
+    @return: The dataset
+    '''
+    dataset = group.create_dataset(name, shape=(columns, 0), maxshape=(columns, None), dtype=np.float64,
+                                   chunks=(columns, CHUNK_ROWS), compression="gzip", shuffle=True)
+    dataset.attrs["MATLAB_class"] = np.bytes_("double")
+    return dataset
+
+def append_rows(dataset, rows):
+    '''
+    @brief: Appends rows to a matrix from create_matrix.
+    @input: The dataset and an array of rows
+    @return: N/A
+    '''
+    if len(rows) == 0:
+        return
+    size = dataset.shape[1]
+    dataset.resize(size + len(rows), axis=1)
+    dataset[:, size:] = rows.T
+
+def set_fields(h5py, group, names):
+    '''
+    @brief: Sets the field names of a struct group. MATLAB reads the fields (and their order) from this attribute.
+    @input: The h5py module, the struct group and its field names in order
+    @return: N/A
+    '''
+    fields = np.empty(len(names), dtype=object)
+    for i, name in enumerate(names):
+        fields[i] = np.frombuffer(name.encode("ascii"), dtype="S1")
+    group.attrs.create("MATLAB_fields", fields, dtype=h5py.vlen_dtype(np.dtype("S1")))
+
+class Mat73Sink:
+    '''
+    @brief: Takes the decoded samples of the raw CSVs, one file after the other, and appends them to the struct S of a
+            MATLAB v7.3 file. Has the same add_frame / add_samples / index interface as samples.SampleBuffer, so the
+            parser engines fill it directly.
+    @input: The path of the MAT file to write (written to a temporary file first, replaced on close), and whether to
+            add the decimation pyramid
+    '''
+    def __init__(self, path, pyramid=False):
+        self.h5py = require_h5py()
+        self.path = path
+        self.pyramid = pyramid
+        self.temp_path = path + "." + str(os.getpid()) + ".tmp"
+        # Each dataset is only ever appended to, so its chunk cache only needs the chunk being filled
+        self.file = self.h5py.File(self.temp_path, "w", userblock_size=512, rdcc_nbytes=2 * 2 * CHUNK_ROWS * 8)
+        self.struct = create_struct_group(self.file, "S")
+
+        self.samples = SampleBuffer()
+        self.index = self.samples.index
+        self.signal_labels = np.zeros(0, dtype=np.int64) # signal ID --> label number
+        self.label_numbers = {} # label --> label number
+        self.labels = [] # label number --> label
+        self.datasets = {} # label number --> dataset, in order of the first plotted sample (the struct's field order)
+        self.pending = {} # label number --> [time, sum, count] of its last row, which later samples can still add to
+
+        self.rollover = {} # repair_second_rollover state, carried across flushes and files
+        self.start = None # Time of the first sample, the provisional start the elapsed times are written from
+        self.first_start = None # Earliest time of the first raw CSV with samples, the real start
+        self.first_file = None
+        self.file_name = None
+        self.file_counts = {} # file name --> [corrected timestamps, timestamps that still go back]
+
+    def __len__(self):
+        return len(self.samples)
+
+    def begin_file(self, name):
+        '''
+        @brief: Starts the samples of the next raw CSV. Files must come in the order they are plotted in.
+        @input: The file name (for the rollover report)
+        @return: N/A
+        '''
+        self.flush()
+        self.file_name = name
+        self.file_counts[name] = [0, 0]
+
+    def add_frame(self, time_ms, frame):
+        '''
+        @brief: Adds every value of a decoded frame.
+        @input: Epoch ms time and a can_decode.DecodedFrame
+        @return: N/A
+        '''
+        self.samples.add_frame(time_ms, frame)
+        if len(self.samples) >= FLUSH_SAMPLES:
+            self.flush()
+
+    def add_samples(self, times_ms, signal_ids, values):
+        '''
+        @brief: Adds a run of samples, e.g. a decoded chunk of the NumPy engine.
+        @input: Arrays of epoch ms times, signal IDs (interned in self.index) and numeric values
+        @return: N/A
+        '''
+        self.samples.add_samples(times_ms, signal_ids, values)
+        if len(self.samples) >= FLUSH_SAMPLES:
+            self.flush()
+
+    def extend(self, other):
+        '''
+        @brief: Adds the samples of another buffer, e.g. one read back from a worker's samples.SampleSpool.
+        @input: The other SampleBuffer
+        @return: N/A
+        '''
+        self.samples.extend(other)
+        if len(self.samples) >= FLUSH_SAMPLES:
+            self.flush()
+
+    def label_codes(self, ids):
+        '''
+        @brief: Maps signal IDs to label numbers. Signals of different messages that share a label are plotted as one.
+        @input: An array of signal IDs
+        @return: An array of label numbers
+        '''
+        if len(self.signal_labels) < len(self.index):
+            new = [self.label_numbers.setdefault(signal.label, len(self.label_numbers))
+                   for signal in self.index.signals[len(self.signal_labels):]]
+            self.labels.extend(list(self.label_numbers)[len(self.labels):])
+            self.signal_labels = np.concatenate((self.signal_labels, np.array(new, dtype=np.int64)))
+        return self.signal_labels[ids]
+
+    def flush(self):
+        '''
+        @brief: Repairs the times of the buffered samples, averages them into rows per label and appends the rows.
+                The last row of each label is held back, the next flush may have more samples for the same timestamp.
+        @input: N/A
+        @return: N/A
+        '''
+        if len(self.samples) == 0:
+            return
+        times, ids, values = self.samples.columns()
+        if self.start is None:
+            self.start = int(times[0])
+            self.first_file = self.file_name
+        if self.file_name == self.first_file:
+            first_start = int(times.min())
+            self.first_start = first_start if self.first_start is None else min(self.first_start, first_start)
+
+        # Every sample takes part in the repair, also the ones that are not plotted, like in mat_export.elapsed_times
+        repaired, corrected, backward = repair_second_rollover(times - self.start, self.rollover)
+        counts = self.file_counts.setdefault(self.file_name, [0, 0])
+        counts[0] += int(np.count_nonzero(corrected))
+        counts[1] += int(np.count_nonzero(backward))
+
+        keep = plottable(self.samples)
+        codes = self.label_codes(ids[keep])
+        times = repaired[keep].astype(np.float64)
+        values = values[keep]
+        self.samples.clear()
+        if len(codes) == 0:
+            return
+
+        # New labels become struct fields in order of their first sample
+        firsts, first_rows = np.unique(codes, return_index=True)
+        for code in firsts[np.argsort(first_rows)].tolist():
+            if code not in self.datasets:
+                self.datasets[code] = create_matrix(self.struct, self.labels[code], 2)
+
+        # Group by label keeping sample order, then sum every run of equal timestamps within a label
+        order = np.argsort(codes, kind="stable")
+        codes = codes[order]
+        times = times[order]
+        values = values[order]
+        starts = np.flatnonzero(np.concatenate(([True], (codes[1:] != codes[:-1]) | (times[1:] != times[:-1]))))
+        sums = np.add.reduceat(values, starts)
+        counts = np.diff(np.append(starts, len(values))).astype(np.float64)
+        row_times = times[starts]
+        row_codes = codes[starts]
+        bounds = np.flatnonzero(np.concatenate(([True], row_codes[1:] != row_codes[:-1], [True])))
+        for first, last in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            code = int(row_codes[first])
+            pending = self.pending.get(code)
+            label_times = row_times[first:last]
+            label_sums = sums[first:last]
+            label_counts = counts[first:last]
+            if pending is not None:
+                if pending[0] == label_times[0]:
+                    label_sums[0] += pending[1]
+                    label_counts[0] += pending[2]
+                else:
+                    self.append(code, np.array([pending[0]]), np.array([pending[1] / pending[2]]))
+            self.append(code, label_times[:-1], label_sums[:-1] / label_counts[:-1])
+            self.pending[code] = [label_times[-1], label_sums[-1], label_counts[-1]]
+
+    def append(self, code, times, means):
+        '''
+        @brief: Appends rows to a label's dataset.
+        @input: The label number and the elapsed times and values of the rows
+        @return: N/A
+        '''
+        append_rows(self.datasets[code], np.column_stack((times, means)))
+
+    def close(self):
+        '''
+        @brief: Writes the remaining rows, moves the times to the real start, builds the pyramid and finishes the MAT file.
+        @input: N/A
+        @return: N/A
+        '''
+        self.flush()
+        for code, (row_time, row_sum, row_count) in self.pending.items():
+            self.append(code, np.array([row_time]), np.array([row_sum / row_count]))
+        self.pending = {}
+        names = [self.labels[code] for code in self.datasets]
+        set_fields(self.h5py, self.struct, names)
+
+        # Elapsed times so far are from the first sample, the first raw CSV may have had earlier ones after it
+        shift = 0.0
+        if self.start is not None and self.first_start < self.start:
+            shift = float(self.start - self.first_start)
+        levels = []
+        if self.pyramid:
+            for factor in PYRAMID_FACTORS:
+                group = create_struct_group(self.file, "S" + str(factor))
+                set_fields(self.h5py, group, names)
+                levels.append({code: create_matrix(group, self.labels[code], 4) for code in self.datasets})
+        if shift or levels:
+            # One pass over every label, a block at a time
+            for code, dataset in self.datasets.items():
+                for first in range(0, dataset.shape[1], BLOCK_ROWS):
+                    rows = dataset[:, first:first + BLOCK_ROWS]
+                    if shift:
+                        rows[0] += shift
+                        dataset[0, first:first + rows.shape[1]] = rows[0]
+                    if levels:
+                        for matrices, (level_rows, bins) in zip(levels, decimate(rows[0], rows[1], [rows.shape[1]])):
+                            append_rows(matrices[code], level_rows)
+        self.file.close()
+        write_header(self.temp_path)
+        os.replace(self.temp_path, self.path)
+
+        for name, (corrections, jumps) in self.file_counts.items():
+            report_rollover(name, corrections, jumps)
+        print('Saved struct with ' + str(len(self.datasets)) + ' signals in ' + self.path + ' (MAT v7.3)')
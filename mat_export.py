@@ -0,0 +1,397 @@
+########################################################################
+########################################################################
+# Parsed Data CSV to MAT struct Code Section
+########################################################################
+########################################################################
+
+"""
+@Author: Sophia Smith + Bo Han Zhu
+@Date: 2/11/2022
+@Description: Takes a Parse_Data folder of CSVs and outputs a .mat struct for plotting.
+              Split out of parser_api so only the MAT export pays for importing pandas/numpy/scipy.
+
+create_mat():
+    read_files() --> create_dataframe(csv_files) --> get_time_elapsed(frames_list) --> create_struct(frames_list1) --> save_mat
+    get_time_elapsed --> timestamps.parse_times_ms / elapsed_times --> repair_second_rollover
+    create_struct --> aggregate_struct
+save_mat --> create_pyramid --> decimate (optional S10/S100/S1000 min/max/mean envelopes)
+
+parser_api.parse_folder(direct=True) --> samples_struct(decoded samples) --> elapsed_times / plottable / aggregate_struct --> save_mat
+
+"""
+
+# Imports
+import os
+import sys
+import pandas as pd
+import numpy as np
+from scipy.io import savemat
+from parse_manifest import Manifest
+from timestamps import parse_times_ms
+
+DEBUG = False # Set True for option error print statements
+PYRAMID_FACTORS = [10, 100, 1000] # Rows per bin of each decimation pyramid level (S10, S100, S1000)
+
+def read_files():
+    '''
+    @brief: Reads parsed data files from Parsed_Data folder and returns a 
+            list of file paths (as strings)
+    @input: None
+    @return: None
+    '''
+    try:
+        path_name = 'Parsed_Data'
+
+        file_path = []
+        file_count = 0
+        for root, dirs, files in os.walk(path_name, topdown=False):
+            for name in files:
+                if ".CSV" in name or ".csv" in name:
+                    fp = os.path.join(root, name)
+                    file_path.append(fp)
+                    file_count += 1
+    except:
+        print('FATAL ERROR: Process failed at step 1.')
+        sys.exit(0)
+
+    print('Step 1: found ' + str(file_count) + ' files in the Parsed_Data folder')
+    return file_path
+
+def create_dataframe(files = []):
+    '''
+    @brief: Reads parsed data file and creates a pandas dataframe.
+            Each row is formatted to work with the Matlab parser. 
+    @input: A list of files
+    @return: A dataframe list
+    '''
+    try:
+        df_list = []
+        for f in files:
+            df = pd.read_csv(f)
+            df_list.append(df)
+    except:
+        print('FATAL ERROR: Process failed at step 2.')
+        sys.exit(0)
+
+    print('Step 2: created dataframes')
+
+    return df_list
+
+def repair_second_rollover(time_elapsed, state=None):
+    '''
+    @brief: Sometimes the Teensy has a slight ms miscue where it jumps back 1 sec on a second change. A sample that jumps
+            back by up to a second gets the second added back, and the samples after it keep the second for as long as they
+            come out earlier than the (repaired) sample before them. Jumps back of more than a second are not miscues
+            (e.g. logs that overlap), so they are left as they are and end any correction in progress.
+            Sample by sample this is a two-state machine, vectorized with cumulative operations: a sample is corrected
+            when there was a miscue jump since the last step that ends the correction.
+    @input: An int64 array of elapsed times in ms, in file order (all files back to back, so a miscue can span two files),
+            and optionally a dictionary that carries the repair over to the next call when the times come in pieces
+            (see mat73_sink); it starts out empty and is updated in place
+    @return: (the repaired int64 array, boolean array of the corrected samples, boolean array of the samples that still
+             go back in time, i.e. non-monotonic segments left as they are)
+    '''
+    if len(time_elapsed) == 0:
+        return time_elapsed, np.zeros(0, dtype=bool), np.zeros(0, dtype=bool)
+    if state is None:
+        state = {}
+    # Step from the raw sample before; the first sample only counts as a miscue if it is just before the start
+    step = np.diff(time_elapsed, prepend=state.get("previous", -1))
+    shifted = (step + 1000).view(np.uint64) # Unsigned, so each range check below is a single comparison
+
+    jump_back = shifted < 1000 # -1000 <= step < 0, starts (or continues) a correction
+    jumps_before = state.get("jumps", 0)
+    ended_before = state.get("ended", 0)
+    if not jump_back.any() and jumps_before == ended_before:
+        # Most logs never have a miscue
+        corrected = np.zeros(len(time_elapsed), dtype=bool)
+        repaired = time_elapsed
+    else:
+        # -1000 <= step < 1000 keeps a correction going, anything else (a full second forward, or further back) ends it
+        ends = shifted >= 2000
+        if "previous" not in state:
+            ends[0] = False
+        # Miscue jumps so far vs. as of the last end (jumps only grows, so that is a running maximum)
+        jumps = np.cumsum(jump_back, dtype=np.int32 if len(jump_back) + jumps_before < 2**31 else np.int64) + jumps_before
+        jumps_at_end = np.where(ends, jumps, ended_before)
+        np.maximum.accumulate(jumps_at_end, out=jumps_at_end)
+        corrected = jumps > jumps_at_end
+        repaired = time_elapsed + corrected * 1000
+        state["jumps"] = int(jumps[-1])
+        state["ended"] = int(jumps_at_end[-1])
+    backward = np.zeros(len(repaired), dtype=bool)
+    backward[1:] = repaired[1:] < repaired[:-1]
+    if "repaired" in state:
+        backward[0] = repaired[0] < state["repaired"]
+    state["previous"] = int(time_elapsed[-1])
+    state["repaired"] = int(repaired[-1])
+    return repaired, corrected, backward
+
+def get_time_elapsed(frames = [], files = None):
+    '''
+    @brief: Calculated the elapsed time for each label based on a baseline, and repairs second rollover miscues
+            (see repair_second_rollover). Prints how many timestamps were corrected in each file.
+    @input: A dataframe list and the names of their files (for the report)
+    @ouput: An updated dataframe list with elapsed times
+    '''
+    if files is None:
+        files = ["file " + str(i + 1) for i in range(len(frames))]
+    df_list = []
+    names = []
+    timestamps = []
+    for df, name in zip(frames, files):
+        if len(df) == 0:
+            if DEBUG: print("Frame " + name + " was skipped in elapsed time calculation.")
+            continue
+        try:
+            # Epoch ms of every row, parsed from the ISO text in one pass
+            timestamps.append(parse_times_ms(df['time']))
+        except (KeyError, ValueError) as e:
+            print('FATAL ERROR: Process failed at step 3, bad time column in ' + name + ': ' + str(e))
+            sys.exit(0)
+        df_list.append(df)
+        names.append(name)
+
+    for df, file_elapsed in zip(df_list, elapsed_times(timestamps, names)):
+        df['time_elapsed'] = file_elapsed
+
+    print('Step 3: calculated elapsed time')
+    return df_list
+
+def elapsed_times(timestamps, names):
+    '''
+    @brief: Turns the epoch ms times of each file into elapsed times from the start of the first file, repairing second
+            rollover miscues across all files at once. Prints how many timestamps were corrected in each file.
+    @input: A list of int64 epoch ms arrays, one per (non-empty) file in file order, and the names of the files
+    @return: A list of float64 elapsed time arrays in ms, one per file
+    '''
+    if not timestamps:
+        return []
+    # The start time is set once, from the first (i.e. earliest) file
+    start_time = timestamps[0].min()
+    time_elapsed, corrected, backward = repair_second_rollover(np.concatenate(timestamps) - start_time)
+    bounds = np.cumsum([len(file_times) for file_times in timestamps])[:-1]
+    for name, file_corrected, file_backward in zip(names, np.split(corrected, bounds), np.split(backward, bounds)):
+        report_rollover(name, int(np.count_nonzero(file_corrected)), int(np.count_nonzero(file_backward)))
+    return np.split(time_elapsed.astype(np.float64), bounds)
+
+def report_rollover(name, corrections, jumps):
+    '''
+    @brief: Prints how many timestamps of a file repair_second_rollover corrected, if any.
+    @input: The file name, the number of corrected timestamps and the number that still go back in time
+    @return: N/A
+    '''
+    if corrections or jumps:
+        print('    ' + name + ': ' + str(corrections) + ' timestamps moved forward 1 s (second rollover miscue), ' +
+              str(jumps) + ' still go back in time (left as they are)')
+
+def create_struct(frames = []):
+    '''
+    @brief: Formats dataframe data to work with the Matlab parser: for each label, an Nx2 array of elapsed times and values.
+            Values logged under the same timestamp are averaged into one row. All files are stacked and grouped by label
+            in one pass (a stable sort keeps the samples of a label in file order), then every run of equal timestamps
+            within a label is averaged with a single reduceat.
+    @input: A list of dataframes of the original CSVs with elapsed times
+    @return: A dictionary of label --> Nx2 array of [time_elapsed, value] rows
+    '''
+    labels = []
+    times = []
+    values = []
+    try:
+        for df in frames:
+            # Only numeric values are plotted; enum names, hex and the like are skipped
+            numbers = pd.to_numeric(df['value'], errors='coerce').to_numpy(dtype=np.float64)
+            numeric = ~np.isnan(numbers)
+            labels.append(df['label'].to_numpy(dtype=object)[numeric])
+            times.append(df['time_elapsed'].to_numpy(dtype=np.float64)[numeric])
+            values.append(numbers[numeric])
+    except KeyError as e:
+        print('FATAL ERROR: Process failed at step 4, missing column: ' + str(e))
+        sys.exit(0)
+
+    struct = {}
+    if labels:
+        codes, names = pd.factorize(np.concatenate(labels))
+        struct = aggregate_struct(codes, names, np.concatenate(times), np.concatenate(values))
+
+    print('Step 4: created struct')
+    return struct
+
+def aggregate_struct(codes, names, times, values):
+    '''
+    @brief: Groups samples by label and averages the values logged under the same timestamp into one row.
+            A stable sort keeps the samples of a label in file order, then every run of equal timestamps within a label
+            is averaged with a single reduceat.
+    @input: Integer label codes (numbered in order of first appearance), the label of each code, and the elapsed times
+            and values of the samples, all in file order
+    @return: A dictionary of label --> Nx2 array of [time_elapsed, value] rows, in order of the codes
+    '''
+    struct = {}
+    if len(codes) == 0:
+        return struct
+    # Group by label, keeping file order within a label (small integer codes sort in linear time)
+    order = np.argsort(codes.astype(np.int16 if len(names) < 2**15 else np.int64), kind="stable")
+    codes = codes[order]
+    times = times[order]
+    values = values[order]
+
+    # A row starts at each new label and at each new timestamp within a label
+    starts = np.flatnonzero(np.concatenate(([True], (codes[1:] != codes[:-1]) | (times[1:] != times[:-1]))))
+    means = np.add.reduceat(values, starts) / np.diff(np.append(starts, len(values)))
+    rows = np.column_stack((times[starts], means))
+    row_codes = codes[starts]
+    bounds = np.flatnonzero(row_codes[1:] != row_codes[:-1]) + 1
+    for code, label_rows in zip(row_codes[np.concatenate(([0], bounds))].tolist(), np.split(rows, bounds)):
+        struct[names[code]] = label_rows
+    return struct
+
+def plottable(samples):
+    '''
+    @brief: Picks the samples that read back from the Parsed_Data CSVs as numbers, the same ones create_struct plots:
+            NaNs, hex values and enum values that have a name are skipped.
+    @input: A samples.SampleBuffer
+    @return: A boolean array over the samples
+    '''
+    from can_decode import Choices
+    times, ids, values = samples.columns()
+    keep = ~np.isnan(values)
+    signals = samples.index.signals
+    hex_ids = [signal_id for signal_id, signal in enumerate(signals) if signal.format == "hex"]
+    choice_ids = [signal_id for signal_id, signal in enumerate(signals) if isinstance(signal.format, Choices)]
+    if hex_ids:
+        keep &= ~np.isin(ids, hex_ids)
+    for signal_id in choice_ids:
+        choices = signals[signal_id].format
+        rows = np.flatnonzero(ids == signal_id)
+        if choices.default is not None:
+            # Every value has a name
+            keep[rows] = False
+        else:
+            keep[rows] &= ~np.isin(values[rows], list(choices.names))
+    return keep
+
+def samples_struct(file_samples, files):
+    '''
+    @brief: Builds the same struct as create_struct straight from the decoded samples of each raw CSV
+            (see parser_api.parse_folder direct mode), without writing or reading back the Parsed_Data CSVs.
+    @input: A list of samples.SampleBuffer, one per raw CSV in file order, and the names of the files (for the report)
+    @return: A dictionary of label --> Nx2 array of [time_elapsed, value] rows
+    '''
+    buffers = [(samples, name) for samples, name in zip(file_samples, files) if len(samples)]
+    elapsed = elapsed_times([samples.columns()[0] for samples, name in buffers], [name for samples, name in buffers])
+    print('Calculated elapsed time of ' + str(sum(len(samples) for samples, name in buffers)) + ' decoded samples')
+
+    signal_ids = []
+    times = []
+    values = []
+    labels = []
+    for (samples, name), file_elapsed in zip(buffers, elapsed):
+        keep = plottable(samples)
+        ids = samples.columns()[1][keep]
+        # Signals of different messages that share a label are plotted as one, like the CSV route does
+        file_labels = np.array([signal.label for signal in samples.index.signals], dtype=object)
+        signal_ids.append(ids)
+        labels.append(file_labels)
+        times.append(file_elapsed[keep])
+        values.append(samples.columns()[2][keep])
+
+    struct = {}
+    if buffers:
+        # Label codes in order of first appearance: first factorize the (few) signal IDs, then map them to labels
+        offsets = np.cumsum([0] + [len(file_labels) for file_labels in labels])[:-1]
+        id_codes, unique_ids = pd.factorize(np.concatenate([ids.astype(np.int64) + offset for ids, offset in zip(signal_ids, offsets)]))
+        label_codes, names = pd.factorize(np.concatenate(labels)[unique_ids])
+        struct = aggregate_struct(label_codes[id_codes], names, np.concatenate(times), np.concatenate(values))
+
+    print('Created struct')
+    return struct
+
+def decimate(times, values, lengths, factors=PYRAMID_FACTORS):
+    '''
+    @brief: Builds min/max/mean envelopes of signals for bins of growing size, so a plot can load a coarse level for a
+            wide window and full rate data only when zoomed in. Each level is reduced from the one before (min of the
+            mins, max of the maxes, sums and counts for the mean), every signal at once with one reduceat per column.
+            The last bin of a signal may hold fewer rows.
+    @input: The times and values of the rows of one or more signals back to back, the number of rows of each signal,
+            and the bin sizes in rows (each a multiple of the one before)
+    @return: A list with, for each bin size, (Kx4 array of [time of the bin's first row, min, max, mean] rows,
+             array of the number of bins of each signal)
+    '''
+    lengths = np.asarray(lengths, dtype=np.int64)
+    if len(values) == 0:
+        return [(np.zeros((0, 4)), np.zeros(len(lengths), dtype=np.int64)) for factor in factors]
+    mins = maxs = sums = values
+    counts = np.ones(len(values))
+    levels = []
+    previous = 1
+    for factor in factors:
+        step = factor // previous
+        bins = -(-lengths // step)
+        # First row of every bin: the signal's first row plus whole steps
+        bin_offsets = np.repeat(np.cumsum(bins) - bins, bins)
+        starts = np.repeat(np.cumsum(lengths) - lengths, bins) + (np.arange(len(bin_offsets)) - bin_offsets) * step
+        times = times[starts]
+        mins = np.minimum.reduceat(mins, starts)
+        maxs = np.maximum.reduceat(maxs, starts)
+        sums = np.add.reduceat(sums, starts)
+        counts = np.add.reduceat(counts, starts)
+        levels.append((np.column_stack((times, mins, maxs, sums / counts)), bins))
+        lengths = bins
+        previous = factor
+    return levels
+
+def create_pyramid(struct):
+    '''
+    @brief: Builds the decimation pyramid of a struct (see decimate), one struct per bin size.
+    @input: A dictionary of label --> Nx2 array of [time_elapsed, value] rows
+    @return: A dictionary of MAT variable name (S10, S100, ...) --> dictionary of label --> Kx4 array of
+             [time_elapsed, min, max, mean] rows
+    '''
+    names = list(struct)
+    rows = np.concatenate([struct[name] for name in names]) if names else np.zeros((0, 2))
+    pyramid = {}
+    for factor, (level_rows, bins) in zip(PYRAMID_FACTORS, decimate(rows[:, 0], rows[:, 1], [len(struct[name]) for name in names])):
+        pyramid["S" + str(factor)] = dict(zip(names, np.split(level_rows, np.cumsum(bins)[:-1])))
+    return pyramid
+
+def save_mat(struct, inputs, options, pyramid=False):
+    '''
+    @brief: Saves the struct to output.mat as S and records it in the manifest.
+    @input: The struct, the input files and options output.mat was made from (for parse_manifest), and whether to
+            also save the decimation pyramid (create_pyramid) as S10, S100 and S1000
+    @return: N/A
+    '''
+    manifest = Manifest()
+    variables = {'S': struct}
+    if pyramid:
+        variables.update(create_pyramid(struct))
+        options = dict(options, pyramid=True)
+    try:
+        savemat('output.mat', variables, long_field_names=True)
+        print('Saved struct in output.mat file.')
+        manifest.record("mat", "output.mat", inputs, options)
+        manifest.save()
+    except:
+        print('FATAL ERROR: Failed to create .mat file')
+
+def create_mat(force=False, pyramid=False):
+    '''
+    @brief: Entry point to the parser to create the .mat file.
+            Skipped if output.mat was made from the same Parsed_Data CSVs (see parse_manifest), unless force is True.
+    @input: Whether to rebuild output.mat even if it is up to date, and whether to add the decimation pyramid
+    @return: N/A
+    '''
+    print("Step 0: starting...")
+    csv_files = read_files()
+    manifest = Manifest()
+    if not force and manifest.is_current("mat", "output.mat", csv_files, {"pyramid": True} if pyramid else {}, ["output.mat"]):
+        manifest.save()
+        print("output.mat is up to date with Parsed_Data, skipping.")
+        return
+    manifest.save()
+    frames_list = create_dataframe(csv_files)
+    frames_list1 = get_time_elapsed(frames_list, csv_files)
+    struct1 = create_struct(frames_list1)
+    save_mat(struct1, csv_files, {}, pyramid)
+
+
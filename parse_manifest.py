@@ -0,0 +1,133 @@
+"""
+@Date: 10/18/2026
+@Description: Manifest of the inputs behind every output of parse_folder and create_mat, so unchanged files are not
+              parsed again. Each input file is fingerprinted by size, mtime and content hash; each entry also stores
+              the hash of the DBC set and any options that change the outputs. A file whose size and mtime match is
+              trusted without reading it, a file whose mtime changed (e.g. copied off the SD card again) is re-hashed
+              and still skipped if its content is the same.
+
+dbc_set_hash --> file_hash
+Manifest --> is_current --> fingerprint --> file_hash
+         --> record --> save
+"""
+
+# Imports
+import os
+import json
+import hashlib
+
+MANIFEST_FILE = "parse_manifest.json"
+HASH_BLOCK = 1024 * 1024
+
+def file_hash(path):
+    '''
+    @brief: Hashes the content of a file.
+    @input: The path of the file
+    @return: The hex digest
+    '''
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def dbc_set_hash(paths):
+    '''
+    @brief: Hashes the names and contents of a set of DBC files, so outputs decoded with other DBCs are parsed again.
+    @input: The DBC file paths (e.g. from parser_api.list_dbc_files)
+    @return: The hex digest
+    '''
+    items = [(path, file_hash(path)) for path in sorted(paths)]
+    return hashlib.blake2b(repr(items).encode(), digest_size=16).hexdigest()
+
+def fingerprint(path, previous=None):
+    '''
+    @brief: Gets the size, mtime and content hash of a file. The hash of the previous fingerprint is reused when the
+            size and mtime have not changed.
+    @input: The path of the file and its previous fingerprint (or None)
+    @return: A dictionary with size, mtime and hash
+    '''
+    stat = os.stat(path)
+    if previous is not None and previous["size"] == stat.st_size and previous["mtime"] == stat.st_mtime_ns:
+        return dict(previous)
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": file_hash(path)}
+
+class Manifest:
+    '''
+    @brief: Manifest file with one section per kind of output ("parse" for raw CSVs, "mat" for output.mat).
+            Each section maps a key to {"inputs": {path: fingerprint}, "options": {...}, plus any extra fields}.
+    @input: The path of the manifest file
+    '''
+    def __init__(self, path=MANIFEST_FILE):
+        self.path = path
+        self.sections = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self.sections = json.load(f)
+            except ValueError:
+                # A corrupt manifest only means everything is parsed again
+                print("WARNING: Ignoring unreadable " + path)
+                self.sections = {}
+
+    def get(self, section, key):
+        '''
+        @brief: Looks up an entry.
+        @input: The section and key of the entry
+        @return: The entry, or None
+        '''
+        return self.sections.get(section, {}).get(key)
+
+    def is_current(self, section, key, inputs, options, outputs):
+        '''
+        @brief: Checks if an output was made from the same inputs and options and still exists.
+                Refreshes the stored mtimes of inputs that were touched but not changed.
+        @input: The section and key of the entry, the input paths, the options dictionary and the output paths
+        @return: True if the output can be reused
+        '''
+        entry = self.get(section, key)
+        if entry is None or entry["options"] != options or sorted(entry["inputs"]) != sorted(inputs):
+            return False
+        if not all(os.path.exists(output) for output in outputs):
+            return False
+        for path in inputs:
+            if not os.path.exists(path):
+                return False
+            current = fingerprint(path, entry["inputs"][path])
+            if current["hash"] != entry["inputs"][path]["hash"]:
+                return False
+            entry["inputs"][path] = current
+        return True
+
+    def record(self, section, key, inputs, options, **extra):
+        '''
+        @brief: Stores the fingerprints of the inputs an output was just made from.
+        @input: The section and key of the entry, the input paths, the options dictionary and extra fields to keep
+        @return: N/A
+        '''
+        previous = self.get(section, key) or {"inputs": {}}
+        entry = {"inputs": {path: fingerprint(path, previous["inputs"].get(path)) for path in inputs}, "options": options}
+        entry.update(extra)
+        self.sections.setdefault(section, {})[key] = entry
+
+    def forget_missing(self, section, keys):
+        '''
+        @brief: Drops the entries of a section whose key is not in keys (e.g. raw CSVs that were deleted).
+        @input: The section and the keys to keep
+        @return: N/A
+        '''
+        keys = set(keys)
+        entries = self.sections.get(section, {})
+        for key in [key for key in entries if key not in keys]:
+            del entries[key]
+
+    def save(self):
+        '''
+        @brief: Writes the manifest, replacing the old file only once the new one is complete.
+        @input: N/A
+        @return: N/A
+        '''
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.sections, f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
@@ -1,20 +1,48 @@
 import sys
+import argparse
 sys.path.insert(1, "../telemetry_parsers")
-from parser_api import *
+from parser_api import parse_folder
 
 ########################################################################
 # Entry Point to Framework
 ########################################################################
-print("Welcome to HyTech 2022 Parsing Framework")
-print("The process will be of two parts: CSV to CSV parsing, and then CSV to MAT parsing.")
-print("The entire process will take about 5 mins for a test session's worth of data.")
-print("----------------------------------------------------------------------------------")
-print("Beginning CSV to CSV parsing...")
-parse_folder()
-print("Finished CSV to CSV parsing.")
-print("----------------------------------------------------------------------------------")
-print("Beginning CSV to MAT parsing...")
-create_mat()
-print("Finished CSV to MAT parsing.")
-print("----------------------------------------------------------------------------------")
-print("SUCCESS: Parsing Complete.")
\ No newline at end of file
+# Guarded so that worker processes spawned by parse_folder(jobs=N) can import this file without re-running it
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HyTech parsing framework")
+    parser.add_argument('--engine', '-e', action='store', default='stream', choices=['stream', 'numpy'], required=False, help="Decoder engine for CSV to CSV parsing")
+    parser.add_argument('--jobs', '-j', action='store', type=int, default=1, required=False, help="Number of raw CSVs to parse in parallel")
+    parser.add_argument('--columnar', '-c', action='store', default=None, choices=['session', 'signal'], required=False, help="Also write Parquet files to Columnar_Data, one per session or one per signal (needs pyarrow)")
+    parser.add_argument('--force', action='store_true', required=False, help="Parse every raw CSV and rebuild output.mat even if nothing changed")
+    parser.add_argument('--direct', '-d', action='store_true', required=False, help="Write output.mat straight from the decoded values instead of reading the Parsed_Data CSVs back")
+    parser.add_argument('--no-csv', action='store_true', required=False, help="With --direct, do not write the Parsed_Data and Better_Parsed_Data CSVs at all")
+    parser.add_argument('--mat-version', action='store', default='5', choices=['5', '7.3'], required=False, help="7.3 writes output.mat as an HDF5 based MAT file while parsing, for sessions too long to fit in memory (implies --direct, needs h5py)")
+    parser.add_argument('--pyramid', action='store_true', required=False, help="Also save min/max/mean envelopes of every signal at 10x, 100x and 1000x fewer rows as S10, S100 and S1000 in output.mat")
+    args = parser.parse_args()
+    if args.mat_version == "7.3":
+        args.direct = True
+    if args.no_csv and not args.direct:
+        parser.error("--no-csv needs --direct")
+
+    if args.direct:
+        print("Welcome to HyTech 2022 Parsing Framework")
+        print("Decoding raw CSVs straight to output.mat" + (" (no CSVs)..." if args.no_csv else " (and CSVs)..."))
+        parse_folder(args.engine, args.jobs, args.columnar, args.force, direct=True, csv=not args.no_csv, mat_version=args.mat_version, pyramid=args.pyramid)
+        print("----------------------------------------------------------------------------------")
+        print("SUCCESS: Parsing Complete.")
+        sys.exit(0)
+
+    print("Welcome to HyTech 2022 Parsing Framework")
+    print("The process will be of two parts: CSV to CSV parsing, and then CSV to MAT parsing.")
+    print("The entire process will take about 5 mins for a test session's worth of data.")
+    print("----------------------------------------------------------------------------------")
+    print("Beginning CSV to CSV parsing...")
+    parse_folder(args.engine, args.jobs, args.columnar, args.force)
+    print("Finished CSV to CSV parsing.")
+    print("----------------------------------------------------------------------------------")
+    print("Beginning CSV to MAT parsing...")
+    # Imported here so the CSV to CSV stage does not wait on pandas/scipy
+    from mat_export import create_mat
+    create_mat(args.force, args.pyramid)
+    print("Finished CSV to MAT parsing.")
+    print("----------------------------------------------------------------------------------")
+    print("SUCCESS: Parsing Complete.")
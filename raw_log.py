@@ -0,0 +1,120 @@
+"""
+@Date: 10/18/2026
+@Description: Shared reader for raw data CSVs (a header line, then time,id,len,data lines) built on mmap.
+              The file is mapped read-only and scanned once per line, so nothing holds the whole log as Python strings
+              and peak memory does not grow with the size of the file. Used by parser_api, vector_parser and console_exe.
+
+RawLog --> frames       (timestamp, id, dlc, payload) tuples, one per line
+       --> batches      pandas chunks of time/id/len/data string columns
+       --> split_ranges line-aligned byte ranges for parallel parsing
+"""
+
+# Imports
+import mmap
+
+def normalize_payload(payload, dlc):
+    '''
+    @brief: Strips trailing characters past the message length and zero-fills truncated payloads to 16 hex digits.
+            Sometimes messages come truncated if 0s on the left.
+    @input: The hex payload string and the message length in bytes
+    @return: The 16-digit hex payload string
+    '''
+    return payload[:(dlc * 2)].zfill(16)
+
+class RangeReader:
+    '''
+    @brief: File-like view of a byte range of a RawLog, so pandas can parse one range in chunks.
+    '''
+    def __init__(self, mm, start, end):
+        self.mm = mm
+        self.position = start
+        self.end = end
+
+    def read(self, size=-1):
+        if size < 0 or size > self.end - self.position:
+            size = self.end - self.position
+        data = self.mm[self.position:self.position + size]
+        self.position += size
+        return data
+
+class RawLog:
+    '''
+    @brief: Read-only memory-mapped raw data CSV.
+    @input: The path of the raw CSV
+    '''
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped; treat them as an empty buffer
+            self.mm = b""
+        if hasattr(self.mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            self.mm.madvise(mmap.MADV_SEQUENTIAL)
+        self.size = len(self.mm)
+
+        # Data starts after the header line
+        newline = self.mm.find(b"\n")
+        self.data_start = self.size if newline < 0 else newline + 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self.mm, mmap.mmap):
+            self.mm.close()
+        self.file.close()
+
+    def frames(self, start=None, end=None):
+        '''
+        @brief: Yields every frame of the log (or of a byte range of it) with its payload normalized.
+                Lines with an empty payload or fewer than four fields are skipped.
+        @input: Optional start/end byte offsets; start must be at a line boundary and defaults to the first data line
+        @return: A generator of (raw time string, raw ID string, dlc, 16-digit hex payload string) tuples
+        '''
+        mm = self.mm
+        position = self.data_start if start is None else start
+        end = self.size if end is None else end
+        while position < end:
+            newline = mm.find(b"\n", position, end)
+            stop = end if newline < 0 else newline
+            fields = mm[position:stop].decode().split(",")
+            position = stop + 1
+            if len(fields) < 4:
+                continue
+            payload = fields[3].rstrip("\r")
+            if payload == "":
+                continue
+            dlc = int(fields[2])
+            yield fields[0], fields[1], dlc, normalize_payload(payload, dlc)
+
+    def batches(self, rows, start=None, end=None):
+        '''
+        @brief: Parses the log (or a byte range of it) into chunks of string columns for the NumPy decoder.
+        @input: Lines per chunk and optional start/end byte offsets at line boundaries
+        @return: An iterator of dataframes with time/id/len/data string columns
+        '''
+        import pandas as pd # Only the NumPy engine reads batches, keep pandas out of the console's startup
+        start = self.data_start if start is None else start
+        end = self.size if end is None else end
+        if start >= end:
+            return iter(())
+        return pd.read_csv(RangeReader(self.mm, start, end), header=None, names=["time", "id", "len", "data"], usecols=[0, 1, 2, 3],
+                           dtype=str, keep_default_na=False, chunksize=rows)
+
+    def split_ranges(self, parts):
+        '''
+        @brief: Splits the data lines into roughly equal byte ranges that start and end on line boundaries.
+        @input: The number of ranges wanted
+        @return: A list of (start, end) byte offsets
+        '''
+        starts = [self.data_start]
+        for i in range(1, parts):
+            newline = self.mm.find(b"\n", max(self.size * i // parts, starts[-1]))
+            starts.append(self.size if newline < 0 else newline + 1)
+        starts.append(self.size)
+        return [(start, end) for start, end in zip(starts, starts[1:]) if end > start]
@@ -0,0 +1,195 @@
+"""
+@Date: 10/18/2026
+@Description: Replays a recorded raw data CSV the way the car sent it, for the console's TEST_CSV connection. Frames are
+              paced by their recorded timestamps at real time, N times real time or as fast as possible, so a replay
+              puts the same load on the console as the live link did and a whole session can be reviewed in minutes.
+              Seeking uses a sparse index of (timestamp, byte offset) pairs taken every INDEX_STRIDE bytes of the log:
+              building it only reads one line per stride, and a seek reads at most one stride of lines.
+              Only needs the standard library (raw_log.RawLog for the file).
+
+ReplayIndex --> locate (bisect the sparse index, then scan one stride)
+Replay --> seek / seek_elapsed / set_speed (any thread) --> frames (paced RawLog.frames) --> close
+"""
+
+# Imports
+import time
+import threading
+from array import array
+from bisect import bisect_left
+from raw_log import RawLog
+
+INDEX_STRIDE = 65536 # Bytes of the log between two entries of the sparse index (~2000 frames)
+MAX_GAP_S = 5.0 # Gaps in the log longer than this (logging paused, clock jumps) are skipped instead of waited out
+MAX_LAG_S = 1.0 # If the consumer falls further behind than this, the replay clock restarts instead of catching up in a burst
+
+def parse_elapsed(text):
+    '''
+    @brief: Parses a time into the log as seconds, "mm:ss" or "hh:mm:ss".
+    @input: The text
+    @return: The number of seconds
+    '''
+    seconds = 0.0
+    for part in text.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+class ReplayIndex:
+    '''
+    @brief: Sparse timestamp index of a raw log: the time and byte offset of the first line after every INDEX_STRIDE bytes.
+            Assumes the timestamps of the log are (mostly) increasing, as they are when it was recorded.
+    @input: The RawLog and the stride in bytes
+    '''
+    def __init__(self, log, stride=INDEX_STRIDE):
+        self.log = log
+        self.times = array("q") # ms since the epoch
+        self.offsets = array("q") # byte offset of the line with that time
+        position = log.data_start
+        while position < log.size:
+            time_ms, end = self.line_time(position)
+            if time_ms is not None:
+                self.times.append(time_ms)
+                self.offsets.append(position)
+            newline = log.mm.find(b"\n", max(end, position + stride))
+            if newline < 0:
+                break
+            position = newline + 1
+        self.first_ms = self.times[0] if self.times else 0
+        last_line = log.mm.rfind(b"\n", log.data_start, max(log.data_start, log.size - 1)) + 1
+        last_ms = self.line_time(max(last_line, log.data_start))[0] if log.size > log.data_start else None
+        self.last_ms = last_ms if last_ms is not None else (self.times[-1] if self.times else 0)
+
+    def line_time(self, position):
+        '''
+        @brief: Reads the timestamp of the line starting at a byte offset.
+        @input: The byte offset
+        @return: (the time in ms or None if the line has none, the offset where the line ends)
+        '''
+        end = self.log.mm.find(b"\n", position)
+        end = self.log.size if end < 0 else end
+        comma = self.log.mm.find(b",", position, end)
+        try:
+            return int(self.log.mm[position:comma if comma >= 0 else end]), end
+        except ValueError:
+            return None, end
+
+    def locate(self, time_ms):
+        '''
+        @brief: Finds the first line at or after a time.
+        @input: The time in ms since the epoch
+        @return: The byte offset of the line (the end of the log if every line is earlier)
+        '''
+        if time_ms <= self.first_ms:
+            return self.log.data_start
+        # Start from the last entry strictly before the time, in case lines of that same millisecond precede the next one
+        i = bisect_left(self.times, time_ms) - 1
+        position = self.log.data_start if i < 0 else self.offsets[i]
+        while position < self.log.size:
+            line_ms, end = self.line_time(position)
+            if line_ms is not None and line_ms >= time_ms:
+                break
+            position = end + 1
+        return min(position, self.log.size)
+
+class Replay:
+    '''
+    @brief: Paced playback of a raw log. speed is the multiple of real time, None to play as fast as possible.
+    @input: The path of the raw CSV and the speed
+    '''
+    def __init__(self, path, speed=1.0):
+        self.log = RawLog(path)
+        self.index = ReplayIndex(self.log)
+        self.speed = speed
+        self.pending = None # Byte offset to jump to, set by seek
+        self.resync = False # Restart the replay clock at the next frame, set by set_speed
+        self.wake = threading.Event() # Cuts a pacing sleep short when seeking
+        self.played = 0
+        self.skipped_gaps = 0
+        self.max_lag = 0.0 # Seconds the consumer fell behind the recorded timing, at most
+        self.time_ms = self.index.first_ms # Recorded time of the last frame played
+
+    def seek(self, time_ms):
+        '''
+        @brief: Jumps to the first frame at or after a time. Safe to call from any thread while frames is running.
+        @input: The time in ms since the epoch
+        @return: N/A
+        '''
+        self.pending = self.index.locate(time_ms)
+        self.wake.set()
+
+    def seek_elapsed(self, seconds):
+        '''
+        @brief: Jumps to a time relative to the start of the log, e.g. 1500 for minute 25.
+        @input: Seconds since the first frame
+        @return: N/A
+        '''
+        self.seek(self.index.first_ms + int(seconds * 1000))
+
+    def set_speed(self, speed):
+        '''
+        @brief: Changes the speed, from the next frame on.
+        @input: The multiple of real time, None for as fast as possible
+        @return: N/A
+        '''
+        self.speed = speed
+        self.resync = True
+        self.wake.set()
+
+    def frames(self):
+        '''
+        @brief: Plays the log from the start (or the last seek), waiting until each frame is due.
+        @input: N/A
+        @return: A generator of RawLog.frames tuples (raw time string, raw ID string, dlc, 16-digit hex payload string)
+        '''
+        start = self.log.data_start if self.pending is None else self.pending
+        self.pending = None
+        while True:
+            origin = None # (recorded ms, perf_counter) the pacing counts from
+            for frame in self.log.frames(start):
+                if self.pending is not None:
+                    break
+                time_ms = int(frame[0])
+                speed = self.speed
+                if speed is not None:
+                    now = time.perf_counter()
+                    if origin is None or self.resync or not 0 <= time_ms - self.time_ms <= 1000 * MAX_GAP_S:
+                        if origin is not None and not self.resync:
+                            self.skipped_gaps += 1
+                        origin = (time_ms, now)
+                        self.resync = False
+                    delay = origin[1] + (time_ms - origin[0]) / (1000.0 * speed) - now
+                    if delay > 0.001:
+                        self.wake.clear()
+                        if self.pending is None:
+                            self.wake.wait(delay)
+                        if self.pending is not None:
+                            break
+                    elif -delay > MAX_LAG_S:
+                        self.max_lag = max(self.max_lag, -delay)
+                        origin = (time_ms, now)
+                    else:
+                        self.max_lag = max(self.max_lag, -delay)
+                self.time_ms = time_ms
+                self.played += 1
+                yield frame
+            else:
+                return
+            start, self.pending = self.pending, None
+
+    def stats(self):
+        '''
+        @brief: Gets the progress of the replay.
+        @input: N/A
+        @return: A dictionary of the frames played, the seconds into the log and its length, the speed, the gaps skipped
+                 and the most the consumer fell behind (seconds)
+        '''
+        return {
+            "played": self.played,
+            "elapsed_s": (self.time_ms - self.index.first_ms) / 1000.0,
+            "length_s": (self.index.last_ms - self.index.first_ms) / 1000.0,
+            "speed": self.speed,
+            "skipped_gaps": self.skipped_gaps,
+            "max_lag_s": self.max_lag,
+        }
+
+    def close(self):
+        self.log.close()
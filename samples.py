@@ -0,0 +1,231 @@
+"""
+@Date: 10/18/2026
+@Description: Compact container for decoded samples, shared by the parser's engines and outputs (columnar files, MAT export).
+              A sample is (time_ms, signal_id, value). The message, label, unit and text format of every signal are
+              interned once in a SignalIndex, so a sample only stores a small integer instead of its strings, and the
+              samples themselves are kept in three typed array.array columns (int64, uint32, float64) that grow in
+              place instead of allocating a Python object per value. Only needs the standard library; the columns can be
+              viewed as NumPy arrays (or one structured array) without copying.
+
+SignalIndex --> intern / frame_ids (signal IDs of a can_decode.DecodedFrame, resolved once per message layout)
+SampleBuffer --> add / add_frame / add_samples / extend --> columns / to_array --> clear
+SampleSpool (worker processes) --> close --> read_spool (parent, in order)
+"""
+
+# Imports
+import pickle
+from array import array
+from itertools import repeat
+from collections import namedtuple
+
+# One interned signal. format is the can_decode text format of its values (None, "hex" or a Choices table).
+Signal = namedtuple("Signal", ["message", "label", "unit", "format"])
+
+# dtype of SampleBuffer.to_array
+SAMPLE_DTYPE = [("time_ms", "<i8"), ("signal_id", "<u4"), ("value", "<f8")]
+SPOOL_SAMPLES = 1048576 # Samples a SampleSpool holds in memory before writing them out
+
+class SignalIndex:
+    '''
+    @brief: Interns signals as small integer IDs, numbered in order of first appearance.
+    '''
+    def __init__(self):
+        self.signals = [] # signal ID --> Signal
+        self.ids = {} # (message, label, unit) --> signal ID
+        self.frames = {} # (message, labels) --> array of the frame's signal IDs
+
+    def __len__(self):
+        return len(self.signals)
+
+    def intern(self, message, label, unit, value_format=None):
+        '''
+        @brief: Gets the ID of a signal, adding it the first time it is seen.
+        @input: Message name, signal label, unit and the text format of its values
+        @return: The integer signal ID
+        '''
+        key = (message, label, unit)
+        signal_id = self.ids.get(key)
+        if signal_id is None:
+            signal_id = self.ids[key] = len(self.signals)
+            self.signals.append(Signal(message, label, unit, value_format))
+        return signal_id
+
+    def frame_ids(self, frame):
+        '''
+        @brief: Gets the signal IDs of the values of a decoded frame. Frames of one message share their labels tuple, so
+                the IDs are resolved once per message (or per multiplexer variant) and reused for every later frame.
+        @input: A can_decode.DecodedFrame
+        @return: An array of signal IDs, one per value
+        '''
+        key = (frame.message, frame.labels)
+        ids = self.frames.get(key)
+        if ids is None:
+            formats = frame.formats or repeat(None)
+            ids = self.frames[key] = array("I", [self.intern(frame.message, label, unit, value_format)
+                                                 for label, unit, value_format in zip(frame.labels, frame.units, formats)])
+        return ids
+
+class SampleBuffer:
+    '''
+    @brief: Growable (time_ms, signal_id, value) columns. Enum values are stored as their integer code.
+    @input: The SignalIndex to intern signals in (a new one if not given)
+    '''
+    def __init__(self, index=None):
+        self.index = SignalIndex() if index is None else index
+        self.times = array("q")
+        self.ids = array("I")
+        self.values = array("d")
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, time_ms, signal_id, value):
+        '''
+        @brief: Adds one sample.
+        @input: Epoch ms time, signal ID from the index and numeric value
+        @return: N/A
+        '''
+        self.times.append(time_ms)
+        self.ids.append(signal_id)
+        self.values.append(value)
+
+    def add_frame(self, time_ms, frame):
+        '''
+        @brief: Adds every value of a decoded frame, all with the frame's time.
+        @input: Epoch ms time and a can_decode.DecodedFrame
+        @return: The array of the frame's signal IDs
+        '''
+        ids = self.index.frame_ids(frame)
+        self.times.extend(repeat(time_ms, len(ids)))
+        self.ids.extend(ids)
+        self.values.extend(frame.values)
+        return ids
+
+    def add_samples(self, times_ms, signal_ids, values):
+        '''
+        @brief: Adds a run of samples from NumPy arrays, copying them in bulk.
+        @input: Arrays of epoch ms times, signal IDs and numeric values, all the same length
+        @return: N/A
+        '''
+        import numpy as np # Only the NumPy engine hands over arrays, keep numpy out of the console's startup
+        self.times.frombytes(np.ascontiguousarray(times_ms, dtype=np.int64).tobytes())
+        self.ids.frombytes(np.ascontiguousarray(signal_ids, dtype=np.uint32).tobytes())
+        self.values.frombytes(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+
+    def extend(self, other):
+        '''
+        @brief: Appends the samples of another buffer (e.g. one filled by a worker process), mapping its signal IDs
+                onto this buffer's index.
+        @input: The other SampleBuffer
+        @return: N/A
+        '''
+        if len(other) == 0:
+            return
+        import numpy as np
+        remap = np.array([self.index.intern(*signal) for signal in other.index.signals], dtype=np.uint32)
+        times, ids, values = other.columns()
+        self.add_samples(times, remap[ids], values)
+
+    def columns(self):
+        '''
+        @brief: Views the samples as NumPy arrays without copying. The views are only valid until the buffer changes.
+        @input: N/A
+        @return: (int64 times, uint32 signal IDs, float64 values)
+        '''
+        import numpy as np
+        return (np.frombuffer(self.times, dtype=np.int64), np.frombuffer(self.ids, dtype=np.uint32),
+                np.frombuffer(self.values, dtype=np.float64))
+
+    def to_array(self):
+        '''
+        @brief: Copies the samples into one structured NumPy array of SAMPLE_DTYPE.
+        @input: N/A
+        @return: The structured array
+        '''
+        import numpy as np
+        times, ids, values = self.columns()
+        samples = np.empty(len(ids), dtype=SAMPLE_DTYPE)
+        samples["time_ms"] = times
+        samples["signal_id"] = ids
+        samples["value"] = values
+        return samples
+
+    def clear(self):
+        '''
+        @brief: Drops every sample, keeping the signal index.
+        @input: N/A
+        @return: N/A
+        '''
+        self.times = array("q")
+        self.ids = array("I")
+        self.values = array("d")
+
+class SampleSpool:
+    '''
+    @brief: Collects samples like a SampleBuffer, but writes them to a file every SPOOL_SAMPLES samples, so a worker
+            process can hand the samples of a whole log to its parent without holding them in memory.
+    @input: The path of the spool file
+    '''
+    def __init__(self, path):
+        self.path = path
+        self.samples = SampleBuffer()
+        self.index = self.samples.index
+        self.count = 0
+        self.file = open(path, "wb")
+
+    def __len__(self):
+        return self.count + len(self.samples)
+
+    def add_frame(self, time_ms, frame):
+        '''
+        @brief: Adds every value of a decoded frame.
+        @input: Epoch ms time and a can_decode.DecodedFrame
+        @return: N/A
+        '''
+        self.samples.add_frame(time_ms, frame)
+        if len(self.samples) >= SPOOL_SAMPLES:
+            self.spill()
+
+    def add_samples(self, times_ms, signal_ids, values):
+        '''
+        @brief: Adds a run of samples from NumPy arrays.
+        @input: Arrays of epoch ms times, signal IDs (interned in self.index) and numeric values
+        @return: N/A
+        '''
+        self.samples.add_samples(times_ms, signal_ids, values)
+        if len(self.samples) >= SPOOL_SAMPLES:
+            self.spill()
+
+    def spill(self):
+        '''
+        @brief: Writes the buffered samples to the spool file and empties the buffer.
+        @input: N/A
+        @return: N/A
+        '''
+        if len(self.samples) == 0:
+            return
+        pickle.dump(self.samples, self.file, pickle.HIGHEST_PROTOCOL)
+        self.count += len(self.samples)
+        self.samples.clear()
+
+    def close(self):
+        '''
+        @brief: Writes the remaining samples and closes the spool file.
+        @input: N/A
+        @return: N/A
+        '''
+        self.spill()
+        self.file.close()
+
+def read_spool(path):
+    '''
+    @brief: Reads back the samples of a closed SampleSpool, in the order they were added.
+    @input: The path of the spool file
+    @return: A generator of SampleBuffers, to be merged with SampleBuffer.extend
+    '''
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
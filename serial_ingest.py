@@ -0,0 +1,195 @@
+"""
+@Date: 10/18/2026
+@Description: Live ingest of the Teensy serial link for the console. Reading and decoding used to happen on one thread,
+              one readline() at a time, so whenever decoding (or the GUI) fell behind, nobody drained the port and the
+              256000 baud input buffer overran. Here an I/O thread only drains the port, in chunks of whatever is waiting,
+              through ReadLine, and hands the complete lines to a decoder thread over a queue bounded in lines. The decoder takes
+              everything queued at once and decodes it as one batch. If the decoder falls that far behind, the newest
+              chunk is dropped and counted instead of blocking the reader, so the port is always drained.
+              Queue depth, drops and the latency of each stage are kept in stats() for the console header.
+              Only needs the standard library; the port is any pyserial-like object (read, in_waiting).
+
+SerialIngest --> reader thread: ReadLine.readlines --> queue of at most QUEUE_LINES lines (drop + count when full)
+             --> decoder thread: queue (batched) --> handle(raw_id, raw_message) per line
+             --> stats
+"""
+
+# Imports
+import time
+import queue
+import threading
+
+READ_BYTES = 65536 # Most bytes the reader takes from the port at once
+QUEUE_LINES = 8192 # Lines the queue holds before the reader starts dropping them (~9 s of a saturated 256000 baud link)
+BATCH_LINES = 4096 # Most lines the decoder takes off the queue for one batch
+
+class ReadLine:
+    '''
+    @brief: Buffered line reader of a serial port, reading whatever is waiting at once instead of a byte at a time.
+    @input: The port
+    '''
+    def __init__(self, s):
+        self.buf = bytearray()
+        self.s = s
+
+    def readlines(self):
+        '''
+        @brief: Reads everything waiting on the port (at least one byte, waiting up to the port's timeout) and splits
+                off the complete lines. A partial last line stays buffered for the next call.
+        @input: N/A
+        @return: A list of the complete lines, without their line ending (possibly empty)
+        '''
+        self.buf.extend(self.s.read(max(1, min(READ_BYTES, self.s.in_waiting))))
+        i = self.buf.rfind(b"\n")
+        if i < 0:
+            return []
+        lines = bytes(self.buf[:i]).split(b"\n")
+        del self.buf[:i+1]
+        return lines
+
+class Latency:
+    '''
+    @brief: Running mean and maximum of a duration.
+    '''
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds, count=1):
+        '''
+        @brief: Records a duration, optionally spread over several items.
+        @input: The duration in seconds and the number of items it covers
+        @return: N/A
+        '''
+        self.count += count
+        self.total += seconds
+        self.max = max(self.max, seconds / count)
+
+    def mean_ms(self):
+        return 1000.0 * self.total / self.count if self.count else 0.0
+
+class SerialIngest:
+    '''
+    @brief: Pipelined reader and decoder threads for a serial port.
+    @input: The open port, the function called with (raw_id, raw_message) strings for every line, and the queue size in lines
+    '''
+    def __init__(self, port, handle, depth=QUEUE_LINES):
+        self.reader = ReadLine(port)
+        self.handle = handle
+        # The reader can hand over anything from one line to thousands at once, so the queue is bounded by the lines
+        # in it (queued) rather than by its chunks
+        self.queue = queue.Queue()
+        self.depth = depth
+        self.queued = 0
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.threads = []
+        self.lines = 0 # Lines read off the port
+        self.decoded = 0 # Lines the decoder took off the queue (malformed ones included)
+        self.dropped = 0 # Lines dropped because the queue was full
+        self.overflows = 0 # Times the queue was full
+        self.malformed = 0 # Lines that were not "id,payload"
+        self.max_depth = 0
+        self.read_latency = Latency() # Per chunk: reading it off the port
+        self.wait_latency = Latency() # Per chunk: from read until the decoder took it
+        self.decode_latency = Latency() # Per line: decoding and handling it
+
+    def start(self):
+        '''
+        @brief: Starts the reader and decoder threads (daemons, so they never keep the console open).
+        @input: N/A
+        @return: N/A
+        '''
+        self.threads = [threading.Thread(target=self.read_loop, daemon=True), threading.Thread(target=self.decode_loop, daemon=True)]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        '''
+        @brief: Asks both threads to stop. The reader stops after its current read (at most the port's timeout).
+        @input: N/A
+        @return: N/A
+        '''
+        self.stopped.set()
+
+    def read_loop(self):
+        '''
+        @brief: The I/O thread: drains the port and queues the complete lines, never waiting on the decoder.
+        @input: N/A
+        @return: N/A
+        '''
+        while not self.stopped.is_set():
+            start = time.perf_counter()
+            lines = self.reader.readlines()
+            if not lines:
+                continue
+            now = time.perf_counter()
+            self.read_latency.add(now - start)
+            self.lines += len(lines)
+            with self.lock:
+                full = self.queued + len(lines) > self.depth
+                if not full:
+                    self.queued += len(lines)
+                    self.max_depth = max(self.max_depth, self.queued)
+            if full:
+                self.overflows += 1
+                self.dropped += len(lines)
+            else:
+                self.queue.put((now, lines))
+
+    def decode_loop(self):
+        '''
+        @brief: The decoder thread: takes every queued chunk at once (up to BATCH_LINES lines) and decodes the lines.
+        @input: N/A
+        @return: N/A
+        '''
+        while not self.stopped.is_set():
+            try:
+                chunks = [self.queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            count = len(chunks[0][1])
+            while count < BATCH_LINES:
+                try:
+                    chunks.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+                count += len(chunks[-1][1])
+            start = time.perf_counter()
+            for read_time, lines in chunks:
+                self.wait_latency.add(start - read_time)
+                for line in lines:
+                    fields = line.strip().split(b",")
+                    if len(fields) < 2:
+                        self.malformed += 1
+                        continue
+                    try:
+                        self.handle(fields[0].decode(), fields[1].decode())
+                    except ValueError: # Not hex, or a payload cut off mid-byte
+                        self.malformed += 1
+            self.decode_latency.add(time.perf_counter() - start, count)
+            self.decoded += count
+            with self.lock:
+                self.queued -= count
+
+    def stats(self):
+        '''
+        @brief: Gets the counters of the pipeline.
+        @input: N/A
+        @return: A dictionary of lines read/decoded/dropped/malformed, queue overflows and depth (in lines), and the mean/max
+                 latencies of each stage in milliseconds
+        '''
+        return {
+            "lines": self.lines,
+            "decoded": self.decoded,
+            "dropped": self.dropped,
+            "overflows": self.overflows,
+            "malformed": self.malformed,
+            "depth": self.queued,
+            "max_depth": self.max_depth,
+            "read_ms": self.read_latency.mean_ms(),
+            "wait_ms": self.wait_latency.mean_ms(),
+            "max_wait_ms": 1000.0 * self.wait_latency.max,
+            "decode_ms": self.decode_latency.mean_ms(),
+        }
@@ -0,0 +1,55 @@
+"""
+@Date: 10/18/2026
+@Description: Timestamp handling shared by the parser, the NumPy engine and the MAT export. Times are integer epoch
+              milliseconds everywhere inside the pipeline; they only become ISO 8601 text ("2022-07-05T17:47:10.001Z")
+              where a CSV is written, and that text is turned back into integers in bulk where a CSV is read.
+              format_time_ms only needs the standard library, the bulk functions import numpy when called.
+
+format_time_ms --> format_second (cached, frames of the same second share it)
+format_times_ms / parse_times_ms (NumPy, whole columns at once)
+"""
+
+# Imports
+from functools import lru_cache
+from datetime import datetime, timedelta
+
+EPOCH = datetime(1970, 1, 1)
+# Millisecond part of the ISO text, by millisecond
+MILLISECONDS = tuple("." + str(ms).zfill(3) + "Z" for ms in range(1000))
+
+@lru_cache(maxsize=256)
+def format_second(second):
+    '''
+    @brief: Formats a whole second as ISO 8601 text, without the milliseconds. Cached, since a log has many frames per second.
+    @input: Seconds since the epoch (UTC)
+    @return: The "YYYY-MM-DDTHH:MM:SS" string
+    '''
+    return (EPOCH + timedelta(seconds=second)).strftime('%Y-%m-%dT%H:%M:%S')
+
+def format_time_ms(time_ms):
+    '''
+    @brief: Converts an epoch millisecond timestamp into human-readable time.
+    @input: The integer time in ms since the epoch (UTC)
+    @return: The "YYYY-MM-DDTHH:MM:SS.mmmZ" string
+    '''
+    second, ms = divmod(time_ms, 1000)
+    return format_second(second) + MILLISECONDS[ms]
+
+def format_times_ms(times_ms):
+    '''
+    @brief: Converts an array of epoch millisecond timestamps into human-readable times in one pass.
+    @input: An integer array of times in ms since the epoch (UTC)
+    @return: An object array of "YYYY-MM-DDTHH:MM:SS.mmmZ" strings
+    '''
+    import numpy as np
+    return np.datetime_as_string(np.asarray(times_ms, dtype=np.int64).astype("datetime64[ms]"), unit="ms").astype(object) + "Z"
+
+def parse_times_ms(times):
+    '''
+    @brief: Converts human-readable times (as written by format_time_ms) back into epoch milliseconds in one pass.
+    @input: An array or Series of "YYYY-MM-DDTHH:MM:SS.mmmZ" strings
+    @return: An int64 array of times in ms since the epoch
+    '''
+    import numpy as np
+    # Cutting the strings to 23 characters drops the "Z", which NumPy's ISO parser does not take
+    return np.asarray(times).astype("U23").astype("datetime64[ms]").astype(np.int64)
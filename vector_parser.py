@@ -0,0 +1,671 @@
+"""
+@Date: 10/18/2026
+@Description: NumPy bulk decoder for raw data CSVs. Alternative engine to parser_api.parse_file that writes the same
+              Parsed_Data and Better_Parsed_Data files, but loads the raw log in large chunks of time/id/len/data
+              columns and pulls every DBC signal out of a whole group of frames with array shifts and masks,
+              instead of calling cantools once per frame.
+
+parse_file_vectorized --> payload_to_uint64
+                      --> decode_chunk --> decode_signal
+                                       --> decode_custom (custom_decoders)
+                      --> write_chunk --> format_columns (text, once per chunk)
+                                      --> write_parsed_lines
+                                      --> write_better_rows
+                                      --> add_columns (numbers, columnar_sink / samples.SampleBuffer)
+
+parse_file_chunked --> decode_range (in parallel) --> carry_range_state --> write_range_rows (in parallel)
+"""
+
+# Imports
+import os
+import sys
+import shutil
+import pickle
+import tempfile
+import multiprocessing
+from collections import Counter, namedtuple
+import numpy as np
+import pandas as pd
+from parser_api import get_dbc_files, write_better_parsed_file
+from can_decode import signal_choices, format_value
+from raw_log import RawLog
+from timestamps import format_times_ms
+from dbc_cache import dbc_table
+from custom_decoders import frame_registry
+from columnar_sink import ColumnarSink, columnar_path, concat_parts
+from samples import SampleSpool, read_spool
+
+CHUNK_ROWS = 16384 # Raw lines per chunk. Bounds the Better_Parsed_Data row matrix (rows x columns) held in memory.
+
+# Bit layout of one DBC signal, precomputed for array extraction. choices is the signal's can_decode.Choices table (or None).
+SignalLayout = namedtuple("SignalLayout", ["name", "unit", "big_endian", "shift", "length", "is_signed", "is_float", "scale", "offset", "is_integer", "choices"])
+# Per-message layout; decode is only set for multiplexed messages, which fall back to cantools per frame,
+# and for custom messages (signals is None), which are decoded per frame by custom_decoders with the text formats in formats
+MessageLayout = namedtuple("MessageLayout", ["name", "signals", "decode", "formats"], defaults=[None])
+# Decoded values of one signal over a chunk: frame positions, signal index within its message, names, unit, the numeric
+# values (enums as their integer code), their can_decode text format, and the value strings once format_columns has run
+SignalColumn = namedtuple("SignalColumn", ["positions", "index", "message", "label", "unit", "values", "format", "text"], defaults=[None, None])
+
+# ASCII code --> hex nibble. 255 marks characters that are not hex digits.
+HEX_LUT = np.full(256, 255, dtype=np.uint8)
+for i, c in enumerate(b"0123456789abcdef"):
+    HEX_LUT[c] = i
+for i, c in enumerate(b"ABCDEF"):
+    HEX_LUT[c] = 10 + i
+
+def compile_layouts(db):
+    '''
+    @brief: Gets the signal layouts of a DBC database, from the DBC cache if it has one (see make_layouts), plus the
+            custom decoders of custom_decoders.frame_registry for frame IDs the DBC does not define.
+    @input: The (merged) DBC database from get_dbc_files
+    @return: A dictionary of integer frame ID --> MessageLayout
+    '''
+    layouts = dbc_table(db, "layouts", make_layouts)
+    custom = frame_registry()
+    if not custom:
+        return layouts
+    layouts = dict(layouts)
+    for frame_id, decoder in custom.items():
+        if frame_id not in layouts:
+            layouts[frame_id] = MessageLayout(decoder.name, None, decoder.decode, decoder.formats)
+    return layouts
+
+def make_layouts(db):
+    '''
+    @brief: Precomputes the shift/mask layout of every signal in the DBC so it can be extracted from 64-bit payloads.
+    @input: The (merged) DBC database from get_dbc_files
+    @return: A dictionary of integer frame ID --> MessageLayout
+    '''
+    layouts = {}
+    for message in db.messages:
+        # Later DBC definitions of the same frame ID win, same as db.decode_message
+        actual_message = db.get_message_by_frame_id(message.frame_id)
+        signals = []
+        for signal in actual_message.signals:
+            if signal.byte_order == "big_endian":
+                # DBC start bit of a Motorola signal is its MSB in sawtooth numbering
+                msb = 8 * (signal.start // 8) + (7 - signal.start % 8)
+                shift = 64 - msb - signal.length
+            else:
+                shift = signal.start
+            # cantools returns ints unless the signal is a float or its scale/offset are fractional
+            is_integer = not signal.is_float and float(signal.scale).is_integer() and float(signal.offset).is_integer()
+            signals.append(SignalLayout(signal.name, str(signal.unit), signal.byte_order == "big_endian", shift, signal.length,
+                                        signal.is_signed, signal.is_float, signal.scale, signal.offset, is_integer, signal_choices(signal)))
+        decode = actual_message.decode if actual_message.is_multiplexed() else None
+        layouts[message.frame_id] = MessageLayout(actual_message.name, tuple(signals), decode)
+    return layouts
+
+def payload_to_uint64(data, lengths):
+    '''
+    @brief: Converts hex payload strings into big- and little-endian 64-bit integers, applying the same
+            truncate-to-length and zero-fill rules as parse_file.
+    @input: An object array of hex payload strings and an integer array of message lengths
+    @return: (payload bytes as an Nx8 uint8 array, big-endian uint64 array, little-endian uint64 array)
+    '''
+    # Only odd-sized payloads need fixing up, which is rare, so do those in Python
+    irregular = np.flatnonzero((pd.Series(data).str.len().to_numpy() != 16) | (lengths != 8))
+    if len(irregular):
+        data = data.copy()
+        for i in irregular:
+            data[i] = data[i][:(int(lengths[i]) * 2)].zfill(16)
+
+    # Payloads longer than 8 bytes are cut to the first 8, which is all cantools reads of them
+    nibbles = HEX_LUT[data.astype("S16").view(np.uint8).reshape(-1, 16)]
+    if (nibbles == 255).any():
+        bad = data[np.flatnonzero((nibbles == 255).any(axis=1))[0]]
+        raise ValueError("non-hexadecimal number found in payload: " + str(bad))
+    payload = np.ascontiguousarray((nibbles[:, 0::2] << 4) | nibbles[:, 1::2])
+    big = payload.view(">u8").ravel().astype(np.uint64)
+    little = payload.view("<u8").ravel().astype(np.uint64)
+    return payload, big, little
+
+def decode_signal(signal, big, little):
+    '''
+    @brief: Extracts one signal from a group of payloads, scaled the way cantools decodes it (without choices).
+    @input: A SignalLayout and the group's big- and little-endian payload arrays
+    @return: A numeric array of the values
+    '''
+    words = big if signal.big_endian else little
+    mask = np.uint64((1 << signal.length) - 1)
+    raw = (words >> np.uint64(signal.shift)) & mask
+
+    if signal.is_float:
+        if signal.length == 32:
+            raw = raw.astype(np.uint32).view(np.float32).astype(np.float64)
+        else:
+            raw = raw.view(np.float64)
+    elif signal.is_signed:
+        raw = raw.view(np.int64)
+        if signal.length < 64:
+            raw = np.where(raw >= (1 << (signal.length - 1)), raw - (1 << signal.length), raw)
+
+    if signal.scale == 1 and signal.offset == 0:
+        return raw
+    if signal.is_integer:
+        return raw.astype(np.int64) * int(signal.scale) + int(signal.offset)
+    return raw.astype(np.float64) * signal.scale + signal.offset
+
+def decode_chunk(chunk, layouts, unknown_ids):
+    '''
+    @brief: Decodes every known frame of a chunk of the raw log.
+    @input: A dataframe with time/id/len/data string columns, the layouts from compile_layouts and a Counter of unknown IDs
+    @return: (row indices of the decoded frames within the chunk, list of SignalColumn)
+    '''
+    ids = chunk["id"].to_numpy(dtype=object)
+    data = chunk["data"].to_numpy(dtype=object)
+
+    # Do not parse if the message is empty, otherwise bugs will occur later.
+    has_data = pd.notna(data) & (data != "")
+
+    # Resolve each distinct ID string once instead of once per frame
+    codes, uniques = pd.factorize(ids)
+    frame_ids = [int(raw_id, 16) for raw_id in uniques]
+    known = np.array([frame_id in layouts for frame_id in frame_ids], dtype=bool)
+
+    unknown_rows = has_data & ~known[codes]
+    if unknown_rows.any():
+        for raw_id, count in pd.Series(ids[unknown_rows]).value_counts(sort=False).items():
+            unknown_ids[raw_id] += count
+
+    rows = np.flatnonzero(has_data & known[codes])
+    columns = []
+    if len(rows) == 0:
+        return rows, columns
+
+    lengths = chunk["len"].to_numpy(dtype=object)[rows].astype(np.int64)
+    payload, big, little = payload_to_uint64(data[rows], lengths)
+
+    # Group frames by ID; positions stay in file order within each group
+    frame_codes = codes[rows]
+    unparseable = []
+    order = np.argsort(frame_codes, kind="stable")
+    bounds = np.flatnonzero(np.diff(frame_codes[order])) + 1
+    for positions in np.split(order, bounds):
+        layout = layouts[frame_ids[frame_codes[positions[0]]]]
+        if layout.signals is None:
+            unparseable.extend(decode_custom(layout, payload, positions, columns))
+        elif layout.decode is None:
+            for index, signal in enumerate(layout.signals):
+                values = decode_signal(signal, big[positions], little[positions])
+                columns.append(SignalColumn(positions, index, layout.name, signal.name, signal.unit, values, signal.choices))
+        else:
+            # Multiplexed messages decode a different set of signals per frame, so let cantools sort them out
+            names = [signal.name for signal in layout.signals]
+            decoded = {}
+            for position in positions:
+                for label, value in layout.decode(payload[position].tobytes(), False).items():
+                    decoded.setdefault(label, ([], []))
+                    decoded[label][0].append(position)
+                    decoded[label][1].append(value)
+            for label, (label_positions, values) in decoded.items():
+                index = names.index(label)
+                signal = layout.signals[index]
+                columns.append(SignalColumn(np.array(label_positions), index, layout.name, label, signal.unit, object_array(values), signal.choices))
+
+    if unparseable:
+        # Frames a custom decoder rejected are skipped like unknown IDs, so renumber the positions without them
+        keep = np.ones(len(rows), dtype=bool)
+        keep[unparseable] = False
+        renumber = np.cumsum(keep) - 1
+        rows = rows[keep]
+        columns = [column._replace(positions=renumber[column.positions]) for column in columns]
+    return rows, columns
+
+def decode_custom(layout, payload, positions, columns):
+    '''
+    @brief: Decodes a group of frames of a custom (non-DBC) message one frame at a time and adds its SignalColumns.
+            Custom messages can pick their labels per frame (e.g. the ACU board ID), so columns are keyed by label.
+    @input: The MessageLayout, the chunk's Nx8 payload array, the positions of the group's frames and the list of columns to extend
+    @return: The positions of the frames the decoder rejected as unparseable
+    '''
+    decode = layout.decode
+    formats = layout.formats
+    decoded = {}
+    unparseable = []
+    for position in positions.tolist():
+        table = decode(payload[position].tobytes())
+        if table == "UNPARSEABLE":
+            unparseable.append(position)
+            continue
+        for index, (label, value, unit) in enumerate(zip(table[1], table[2], table[3])):
+            column = decoded.get((index, label, unit))
+            if column is None:
+                column = decoded[(index, label, unit)] = ([], [])
+            column[0].append(position)
+            column[1].append(value)
+    for (index, label, unit), (label_positions, values) in decoded.items():
+        columns.append(SignalColumn(np.array(label_positions), index, layout.name, label, unit, object_array(values),
+                                    None if formats is None else formats[index]))
+    return unparseable
+
+def object_array(values):
+    '''
+    @brief: Wraps a list of Python numbers in an object array, keeping each value's own type (an int next to a float
+            stays an int, so it prints the same as the per-frame decoders).
+    @input: The list of values
+    @return: The object array
+    '''
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+def format_columns(columns):
+    '''
+    @brief: Formats the values of a chunk's SignalColumns as text, the way they are written to the CSVs. Runs once per
+            chunk, after decoding, so only the CSV writers pay for the strings.
+    @input: The chunk's SignalColumns
+    @return: The SignalColumns with text set
+    '''
+    formatted = []
+    for column in columns:
+        values = column.values.tolist()
+        if column.format is None:
+            text = list(map(str, values))
+        else:
+            text = [format_value(value, column.format) for value in values]
+        formatted.append(column._replace(text=object_array(text)))
+    return formatted
+
+def write_parsed_lines(outfile, prefixes, columns):
+    '''
+    @brief: Writes the long-format Parsed_Data lines of a chunk, ordered by frame and then by signal.
+    @input: The Parsed_Data file, the per-frame "time,0xID," prefixes and the chunk's SignalColumns
+    @return: N/A
+    '''
+    lines = []
+    positions = []
+    indices = []
+    for column in columns:
+        lines.append(prefixes[column.positions] + (column.message + "," + column.label + ",") + column.text + ("," + column.unit + "\n"))
+        positions.append(column.positions)
+        indices.append(np.full(len(column.positions), column.index))
+    lines = np.concatenate(lines)
+    order = np.lexsort((np.concatenate(indices), np.concatenate(positions)))
+    outfile.write("".join(lines[order].tolist()))
+
+def new_labels_in_order(columns, known):
+    '''
+    @brief: Finds the labels of a chunk that are not known yet, in order of first appearance (by frame, then by signal).
+    @input: The chunk's SignalColumns and a container of the labels already known
+    @return: A list of labels
+    '''
+    new_labels = {}
+    for column in columns:
+        if column.label not in known:
+            first = (int(column.positions.min()), column.index)
+            if column.label not in new_labels or first < new_labels[column.label]:
+                new_labels[column.label] = first
+    return sorted(new_labels, key=new_labels.get)
+
+def write_better_rows(spool, raw_times, times, columns, state):
+    '''
+    @brief: Builds the chunk's Better_Parsed_Data rows with the same grouping as parse_file: a row is written whenever
+            the timestamp changes (and always on the second frame), holding every value since the previous row.
+            Unfinished rows are carried over to the next chunk in state.
+    @input: The spool file, raw time strings and integer times of the decoded frames, the chunk's SignalColumns,
+            and the state dictionary (header_list, header_index, frame_count, last_time, pending)
+    @return: N/A
+    '''
+    header_list = state["header_list"]
+    header_index = state["header_index"]
+
+    # Add columns for labels seen for the first time
+    for label in new_labels_in_order(columns, header_index):
+        header_index[label] = len(header_list)
+        header_list.append(label)
+
+    # Mark the frames that trigger a write, then number the rows each frame falls into
+    frame_numbers = state["frame_count"] + np.arange(len(times))
+    previous_times = np.concatenate(([state["last_time"]], times[:-1]))
+    writes = (frame_numbers == 1) | ((frame_numbers >= 2) & (times != previous_times))
+    row_ids = np.cumsum(writes) - writes
+    row_count = int(writes.sum())
+
+    # Rows are mostly empty, so plain lists (filled in C by list repetition) beat a dense object array here
+    width = len(header_list)
+    rows = [[""] * width for _ in range(row_count + 1)]
+    for column_number, value in state["pending"].items():
+        rows[0][column_number] = value
+
+    # Later frames in a row overwrite earlier ones, so keep the last value of each label per row
+    by_label = {}
+    for column in columns:
+        by_label.setdefault(column.label, []).append(column)
+    for label, label_columns in by_label.items():
+        positions = np.concatenate([column.positions for column in label_columns])
+        values = np.concatenate([column.text for column in label_columns])
+        if len(label_columns) > 1:
+            order = np.argsort(positions, kind="stable")
+            positions = positions[order]
+            values = values[order]
+        label_rows = row_ids[positions]
+        last = np.append(label_rows[1:] != label_rows[:-1], True)
+        column_number = header_index[label]
+        for row, value in zip(label_rows[last].tolist(), values[last].tolist()):
+            rows[row][column_number] = value
+
+    for row, raw_time in zip(rows, raw_times[writes].tolist()):
+        row[0] = raw_time
+    pending = rows.pop()
+    spool.write("".join([",".join(row) + "\n" for row in rows]))
+
+    state["pending"] = {column_number: value for column_number, value in enumerate(pending) if value != ""}
+    state["frame_count"] += len(times)
+    state["last_time"] = times[-1]
+
+def frame_times(chunk, rows):
+    '''
+    @brief: Gets the timestamps of the decoded frames of a chunk.
+    @input: The chunk dataframe and the row indices of its decoded frames
+    @return: (raw time strings, integer ms times, "time,0xID," prefixes of the Parsed_Data lines)
+    '''
+    raw_times = chunk["time"].to_numpy(dtype=object)[rows]
+    times = raw_times.astype(np.int64)
+    prefixes = format_times_ms(times) + (",0x" + chunk["id"].to_numpy(dtype=object)[rows] + ",")
+    return raw_times, times, prefixes
+
+def add_columns(sink, times, columns):
+    '''
+    @brief: Hands the decoded signals of a chunk to a columnar_sink.ColumnarSink (or a samples.SampleBuffer) as
+            (time, signal ID, value) samples, in the same order parse_file adds them: by frame, then by signal within the frame.
+    @input: The sink, the integer ms times of the chunk's decoded frames and its SignalColumns
+    @return: N/A
+    '''
+    index = sink.index
+    positions = np.concatenate([column.positions for column in columns])
+    signal_ids = np.concatenate([np.full(len(column.positions), index.intern(column.message, column.label, column.unit, column.format),
+                                         dtype=np.uint32) for column in columns])
+    values = np.concatenate([column.values.astype(np.float64) for column in columns])
+    order = np.lexsort((np.concatenate([np.full(len(column.positions), column.index) for column in columns]), positions))
+    sink.add_samples(times[positions[order]], signal_ids[order], values[order])
+
+def write_chunk(chunk, layouts, outfile, spool, unknown_ids, state, sink=None, samples=None):
+    '''
+    @brief: Decodes one chunk of the raw log and appends it to the Parsed_Data file and the Better_Parsed_Data spool.
+    @input: The chunk dataframe, the layouts, both output files (None to skip the CSVs), the unknown ID Counter,
+            the Better_Parsed_Data state, the columnar sink (or None) and the samples.SampleBuffer to collect (or None)
+    @return: N/A
+    '''
+    rows, columns = decode_chunk(chunk, layouts, unknown_ids)
+    if len(rows) == 0:
+        return
+    if outfile is None:
+        # No CSVs, so none of the text is made
+        times = chunk["time"].to_numpy(dtype=object)[rows].astype(np.int64)
+    else:
+        columns = format_columns(columns)
+        raw_times, times, prefixes = frame_times(chunk, rows)
+        write_parsed_lines(outfile, prefixes, columns)
+        write_better_rows(spool, raw_times, times, columns, state)
+    if sink is not None:
+        add_columns(sink, times, columns)
+    if samples is not None:
+        add_columns(samples, times, columns)
+
+def parse_file_vectorized(filename, dbc, jobs=1, columnar=None, samples=None, csv=True):
+    '''
+    @brief: Reads raw data file and creates the same Parsed_Data and Better_Parsed_Data CSVs as parse_file,
+            decoding the log chunk by chunk with NumPy.
+    @input: The filename of the raw and parsed CSV, the DBC database to decode with, the number of worker
+            processes to split the file across (see parse_file_chunked), the columnar output layout (or None),
+            the samples.SampleBuffer to also collect the decoded values in (or None) and whether to write the CSVs
+    @return: A Counter of the IDs not found in the DBC and how many frames had them
+    '''
+    if jobs > 1:
+        return parse_file_chunked(filename, dbc, jobs, columnar, samples, csv)
+
+    layouts = compile_layouts(dbc)
+    unknown_ids = Counter()
+    state = {
+        "header_list": ["Time"],
+        "header_index": {"Time": 0},
+        "frame_count": 0,
+        "last_time": 0,
+        "pending": {}
+    }
+
+    outfile = None
+    spool = None
+    if csv:
+        outfile = open("Parsed_Data/" + filename, "w")
+        outfile.write("time,id,message,label,value,unit\n")
+        spool = tempfile.TemporaryFile("w+")
+    sink = None
+    if columnar is not None:
+        sink = ColumnarSink(columnar_path(filename), columnar)
+
+    try:
+        with RawLog("Raw_Data/" + filename) as raw_log:
+            for chunk in raw_log.batches(CHUNK_ROWS):
+                write_chunk(chunk, layouts, outfile, spool, unknown_ids, state, sink, samples)
+    except ValueError as e:
+        print("FATAL ERROR: Failed to decode " + filename + ": " + str(e))
+        sys.exit(0)
+
+    if sink is not None:
+        sink.close()
+    if csv:
+        outfile.close()
+        write_better_parsed_file(filename, state["header_list"], spool)
+    return unknown_ids
+
+########################################################################
+# Intra-file parallel parsing
+########################################################################
+'''
+A single huge raw CSV is split into byte ranges aligned to line boundaries and decoded by a process pool in two phases:
+    1. decode_range: each worker decodes its range, writes its Parsed_Data lines to a part file, stores the decoded
+       frames for phase 2, and returns a small summary (labels in order of first appearance, frame count, timestamps of
+       the first/last frame, the last timestamp change and the last value of every label).
+    2. The parent walks the summaries in order to get the global header and the exact Better_Parsed_Data state each
+       range starts from (frames before it, last timestamp, unfinished row), then write_range_rows builds each range's
+       rows in parallel with the same write_better_rows used serially. Parts are stitched back in file order.
+'''
+
+MIN_SPLIT_BYTES = 8 * 1024 * 1024 # Files smaller than this are not worth splitting
+
+# Per-process state of the range worker pool, set up once per worker by init_range_worker
+range_worker = {}
+
+def init_range_worker():
+    '''
+    @brief: Pool initializer. Loads the merged DBC and compiles its layouts once per worker process.
+    @input: N/A
+    @return: N/A
+    '''
+    range_worker["layouts"] = compile_layouts(get_dbc_files(verbose=False))
+
+def decode_range(task):
+    '''
+    @brief: Phase 1 worker. Decodes one byte range of the raw log.
+    @input: (raw CSV path, start, end, path prefix of the part files, columnar output layout or None,
+            whether to store the decoded samples (part + ".samples") and whether to write the CSV parts)
+    @return: A summary dictionary of the range, or None if the range hit a fatal error
+    '''
+    path, start, end, part, columnar, direct, csv = task
+    unknown_ids = Counter()
+    labels = []
+    known = set()
+    last_values = {}
+    frame_count = 0
+    first_time = None
+    last_time = None
+    last_change = None
+
+    raw_log = RawLog(path)
+    outfile = open(part + ".parsed", "w") if csv else None
+    store = open(part + ".frames", "wb") if csv else None
+    sink = None
+    if columnar is not None:
+        sink = ColumnarSink(part + ".columnar", columnar)
+    samples = SampleSpool(part + ".samples") if direct else None
+    try:
+        for chunk in raw_log.batches(CHUNK_ROWS, start, end):
+            if not csv:
+                write_chunk(chunk, range_worker["layouts"], None, None, unknown_ids, None, sink, samples)
+                continue
+            rows, columns = decode_chunk(chunk, range_worker["layouts"], unknown_ids)
+            if len(rows) == 0:
+                continue
+            columns = format_columns(columns)
+            raw_times, times, prefixes = frame_times(chunk, rows)
+            write_parsed_lines(outfile, prefixes, columns)
+            # Phase 2 only writes text, so the numbers are not stored
+            pickle.dump((raw_times, times, [column._replace(values=None) for column in columns]), store, pickle.HIGHEST_PROTOCOL)
+            if sink is not None:
+                add_columns(sink, times, columns)
+            if samples is not None:
+                add_columns(samples, times, columns)
+
+            # Summary: label order, last value of each label, and the last frame whose timestamp differs from the one before
+            new_labels = new_labels_in_order(columns, known)
+            labels.extend(new_labels)
+            known.update(new_labels)
+            for column in columns:
+                position = frame_count + int(column.positions[-1])
+                if column.label not in last_values or position > last_values[column.label][0]:
+                    last_values[column.label] = (position, column.text[-1])
+            previous_time = times[0] if last_time is None else last_time
+            changes = np.flatnonzero(np.concatenate(([previous_time], times[:-1])) != times)
+            if len(changes):
+                last_change = frame_count + int(changes[-1])
+            if first_time is None:
+                first_time = times[0]
+            last_time = times[-1]
+            frame_count += len(times)
+    except ValueError as e:
+        print("FATAL ERROR: Failed to decode " + path + ": " + str(e))
+        return None
+    finally:
+        raw_log.close()
+        if csv:
+            outfile.close()
+            store.close()
+        if sink is not None:
+            sink.close()
+        if samples is not None:
+            samples.close()
+
+    return {
+        "unknown_ids": unknown_ids,
+        "labels": labels,
+        "frame_count": frame_count,
+        "first_time": first_time,
+        "last_time": last_time,
+        "last_change": last_change,
+        "last_values": last_values
+    }
+
+def write_range_rows(task):
+    '''
+    @brief: Phase 2 worker. Builds the Better_Parsed_Data rows of one range from its stored frames.
+    @input: (path prefix of the part files, final header list, Better_Parsed_Data state the range starts from)
+    @return: N/A
+    '''
+    part, header_list, state = task
+    state["header_list"] = header_list
+    state["header_index"] = {label: i for i, label in enumerate(header_list)}
+    with open(part + ".frames", "rb") as store, open(part + ".better", "w") as spool:
+        while True:
+            try:
+                raw_times, times, columns = pickle.load(store)
+            except EOFError:
+                break
+            write_better_rows(spool, raw_times, times, columns, state)
+
+def carry_range_state(state, summary):
+    '''
+    @brief: Advances the Better_Parsed_Data state across one range using only its summary, following the same
+            write rule as write_better_rows (write on the second frame and whenever the timestamp changes).
+    @input: The state before the range (frame_count, last_time, pending as label --> value) and the range's summary
+    @return: The state after the range
+    '''
+    count = summary["frame_count"]
+    if count == 0:
+        return state
+
+    # Find the last frame of the range that triggers a write
+    last_write = summary["last_change"]
+    if last_write is None:
+        if state["frame_count"] == 0 and count >= 2:
+            last_write = 1
+        elif state["frame_count"] == 1 or (state["frame_count"] >= 2 and summary["first_time"] != state["last_time"]):
+            last_write = 0
+
+    if last_write is None:
+        pending = dict(state["pending"])
+        pending.update({label: value for label, (position, value) in summary["last_values"].items()})
+    else:
+        pending = {label: value for label, (position, value) in summary["last_values"].items() if position > last_write}
+
+    return {"frame_count": state["frame_count"] + count, "last_time": summary["last_time"], "pending": pending}
+
+def parse_file_chunked(filename, dbc, jobs, columnar=None, samples=None, csv=True):
+    '''
+    @brief: Creates the same Parsed_Data and Better_Parsed_Data CSVs as parse_file, splitting one raw CSV into
+            line-aligned byte ranges that are decoded in parallel and stitched back in file order.
+    @input: The filename of the raw and parsed CSV, the DBC database (only used when the file is too small to split),
+            the number of worker processes, the columnar output layout (or None), the samples.SampleBuffer to also
+            collect the decoded values in (or None) and whether to write the CSVs
+    @return: A Counter of the IDs not found in the DBC and how many frames had them
+    '''
+    path = "Raw_Data/" + filename
+    if jobs <= 1 or os.path.getsize(path) < MIN_SPLIT_BYTES:
+        return parse_file_vectorized(filename, dbc, 1, columnar, samples, csv)
+
+    with RawLog(path) as raw_log:
+        ranges = raw_log.split_ranges(jobs)
+    tmpdir = tempfile.mkdtemp(prefix="parse_")
+    parts = [os.path.join(tmpdir, str(i)) for i in range(len(ranges))]
+    try:
+        with multiprocessing.Pool(jobs, initializer=init_range_worker) as pool:
+            summaries = pool.map(decode_range, [(path, start, end, part, columnar, samples is not None, csv)
+                                                for (start, end), part in zip(ranges, parts)])
+            if None in summaries:
+                print("FATAL ERROR: Failed to parse " + filename)
+                sys.exit(0)
+
+            unknown_ids = Counter()
+            for summary in summaries:
+                unknown_ids.update(summary["unknown_ids"])
+
+            # Stitch the header and the state each range starts from
+            header_list = ["Time"]
+            known = set(header_list)
+            states = []
+            state = {"frame_count": 0, "last_time": 0, "pending": {}}
+            for summary in summaries:
+                for label in summary["labels"]:
+                    if label not in known:
+                        known.add(label)
+                        header_list.append(label)
+                states.append(state)
+                state = carry_range_state(state, summary)
+            header_index = {label: i for i, label in enumerate(header_list)}
+            states = [dict(state, pending={header_index[label]: value for label, value in state["pending"].items()}) for state in states]
+
+            if csv:
+                pool.map(write_range_rows, [(part, header_list, state) for part, state in zip(parts, states)])
+
+        if csv:
+            with open("Parsed_Data/" + filename, "w") as outfile:
+                outfile.write("time,id,message,label,value,unit\n")
+                for part in parts:
+                    with open(part + ".parsed", "r") as infile:
+                        shutil.copyfileobj(infile, outfile)
+            with open("Better_Parsed_Data/Better" + filename, "w") as outfile2:
+                outfile2.write(",".join(header_list) + "\n")
+                for part in parts:
+                    with open(part + ".better", "r") as infile:
+                        shutil.copyfileobj(infile, outfile2)
+        if samples is not None:
+            for part in parts:
+                for batch in read_spool(part + ".samples"):
+                    samples.extend(batch)
+        if columnar is not None:
+            concat_parts([part + ".columnar" for part in parts], columnar_path(filename), columnar)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    return unknown_ids